@@ -0,0 +1,112 @@
+import timeit
+import tracemalloc
+
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+
+NODE_COUNT = 100_000
+
+
+class DictTextNode:
+    # TextNode as it was before __slots__
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode:
+    # LeafNode as it was before __slots__
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+def bytes_per_node(factory):
+    # The node text is shared, so only the nodes themselves are measured
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    nodes = [factory(i) for i in range(NODE_COUNT)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # Subtract the list holding the nodes
+    allocated -= len(nodes) * 8
+    return allocated / NODE_COUNT
+
+
+def recursive_to_html(node):
+    # ParentNode.to_html as it was before the explicit-stack renderer
+    if isinstance(node, LeafNode):
+        return node.to_html()
+
+    children_html = ""
+    for child in node.children:
+        children_html += recursive_to_html(child)
+    return f"<{node.tag}{node.props_to_html()}>{children_html}</{node.tag}>"
+
+
+def wide_tree():
+    # A long page: many paragraphs with a few inline children each
+    paragraphs = [
+        ParentNode("p", [LeafNode(None, "Some text "), LeafNode("b", "bold"), LeafNode("a", "link", {"href": "/x"})])
+        for _ in range(20_000)
+    ]
+    return ParentNode("div", paragraphs)
+
+
+def deep_tree(depth):
+    node = LeafNode("span", "leaf")
+    for _ in range(depth):
+        node = ParentNode("div", [node, LeafNode("i", "x")])
+    return node
+
+
+def bench_render(label, tree, recursive=True):
+    assert not recursive or recursive_to_html(tree) == tree.to_html()
+    new = min(timeit.repeat(tree.to_html, number=3, repeat=3)) / 3
+    if recursive:
+        old = min(timeit.repeat(lambda: recursive_to_html(tree), number=3, repeat=3)) / 3
+        print(f"{label:<10} recursive {old * 1000:8.2f} ms   explicit stack {new * 1000:8.2f} ms   speedup {old / new:5.2f}x")
+    else:
+        print(f"{label:<10} recursive      n/a (RecursionError)   explicit stack {new * 1000:8.2f} ms")
+
+
+def report(label, before, after):
+    print(f"{label:<10} before {before:7.1f} B/node   after {after:7.1f} B/node   saved {1 - after / before:5.1%}")
+
+
+def main():
+    text = "shared node text"
+
+    report(
+        "TextNode",
+        bytes_per_node(lambda i: DictTextNode(text, TextType.BOLD)),
+        bytes_per_node(lambda i: TextNode(text, TextType.BOLD)),
+    )
+    # Tags are built at runtime (like f"h{level}") so interning is measured.
+    # text_node_to_html_node passes no props for text, bold, italic and code
+    # leaves; an explicit empty dict, now stored as None, is shown apart.
+    report(
+        "LeafNode",
+        bytes_per_node(lambda i: DictLeafNode("".join(["sp", "an"]), text)),
+        bytes_per_node(lambda i: LeafNode("".join(["sp", "an"]), text)),
+    )
+    report(
+        "Leaf {}",
+        bytes_per_node(lambda i: DictLeafNode("".join(["sp", "an"]), text, {})),
+        bytes_per_node(lambda i: LeafNode("".join(["sp", "an"]), text, {})),
+    )
+
+    print()
+    bench_render("wide", wide_tree())
+    bench_render("deep 500", deep_tree(500))
+    bench_render("deep 50k", deep_tree(50_000), recursive=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import timeit
+
+from textnode import TextNode, TextType, split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+
+
+SENTENCE = (
+    "Tolkien wrote **a lot** about *elves* and _hobbits_, kept notes in `elflang`, "
+    "drew ![maps](/images/map.png) and left [letters](/blog/letters) behind. "
+)
+
+
+def six_pass_text_to_textnodes(text):
+    # The previous implementation: one full pass per delimiter and per
+    # image/link splitter
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+def bench(label, func, text, number):
+    seconds = min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number
+    print(f"{label:<12} {seconds * 1000:9.3f} ms per call")
+    return seconds
+
+
+def main():
+    for sentences in (1, 10, 100, 1000):
+        text = SENTENCE * sentences
+        assert six_pass_text_to_textnodes(text) == text_to_textnodes(text)
+
+        number = max(1, 2000 // sentences)
+        print(f"Paragraph of {len(text)} characters:")
+        old = bench("six-pass", six_pass_text_to_textnodes, text, number)
+        new = bench("single-pass", text_to_textnodes, text, number)
+        print(f"{'speedup':<12} {old / new:9.2f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Kept free of generator imports so asking the daemon for a rebuild costs
+# little more than interpreter startup
+
+
+def request(socket_path, message, out=None):
+    # Send one request to the build daemon, print its streamed output to
+    # out and return the final response
+    out = out or sys.stdout
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as responses:
+            for line in responses:
+                response = json.loads(line)
+                if "output" in response:
+                    print(response["output"], file=out, flush=True)
+                else:
+                    return response
+    raise ConnectionError("Build daemon closed the connection without a result")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ask a running build daemon (src/main.py --daemon) to rebuild the site")
+    parser.add_argument("--socket", help="daemon socket (default: .cache/daemon.sock)")
+    commands = parser.add_subparsers(dest="command")
+    build = commands.add_parser("build", help="incremental build (the default)")
+    build.add_argument("--full", action="store_true", help="rebuild everything")
+    paths = commands.add_parser("paths", help="rebuild only what the given changed files affect")
+    paths.add_argument("paths", nargs="+")
+    render = commands.add_parser("render", help="print one page's HTML without writing docs/")
+    render.add_argument("path", help="markdown file, relative to content/ or absolute")
+    commands.add_parser("ping", help="check that the daemon is running")
+    commands.add_parser("stop", help="shut the daemon down")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    socket_path = args.socket or os.path.join(project_root, ".cache", "daemon.sock")
+
+    if args.command == "paths":
+        message = {"command": "paths", "paths": [os.path.abspath(path) for path in args.paths]}
+    elif args.command == "render":
+        message = {"command": "render", "path": os.path.abspath(args.path) if os.path.exists(args.path) else args.path}
+    elif args.command in ("ping", "stop"):
+        message = {"command": args.command}
+    else:
+        message = {"command": "build", "full": getattr(args, "full", False)}
+
+    try:
+        response = request(socket_path, message)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No build daemon on {socket_path}; start one with: python3 src/main.py --daemon", file=sys.stderr)
+        return 2
+
+    if "error" in response:
+        print(response["error"], file=sys.stderr)
+    elif "html" in response:
+        sys.stdout.write(response["html"])
+    else:
+        print(response["summary"])
+    return response.get("exit", 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
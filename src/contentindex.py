@@ -0,0 +1,262 @@
+import os
+import sqlite3
+
+# Bump when the schema changes; an index with another version is rebuilt
+INDEX_VERSION = 3
+
+# Search postings are grouped by the first characters of each term
+TERM_PREFIX_LENGTH = 2
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    path TEXT PRIMARY KEY,
+    hash TEXT,
+    output TEXT NOT NULL,
+    title TEXT,
+    summary TEXT,
+    date TEXT,
+    updated TEXT,
+    draft INTEGER NOT NULL DEFAULT 0,
+    word_count INTEGER NOT NULL DEFAULT 0,
+    searchable INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tags (
+    path TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (path, tag)
+);
+CREATE INDEX IF NOT EXISTS tags_by_tag ON tags (tag);
+CREATE TABLE IF NOT EXISTS links (
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS links_by_path ON links (path);
+CREATE INDEX IF NOT EXISTS links_by_target ON links (target);
+CREATE TABLE IF NOT EXISTS search_documents (
+    path TEXT PRIMARY KEY,
+    id INTEGER NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS terms (
+    path TEXT NOT NULL,
+    term TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS terms_by_path ON terms (path);
+CREATE INDEX IF NOT EXISTS terms_by_prefix ON terms (prefix);
+"""
+
+PAGE_COLUMNS = ("path", "hash", "output", "title", "summary", "date", "updated", "draft", "word_count", "searchable")
+
+
+class ContentIndex:
+    # On-disk index of rendered pages: one row per source (relative to the
+    # content root) with its metadata, tags and outbound links, so listings
+    # and checks can query it instead of re-reading the content tree
+    def __init__(self, path):
+        self.path = path
+        index_dir = os.path.dirname(path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            with self.connection:
+                for table in ("pages", "tags", "links", "search_documents", "terms"):
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+        self.connection.executescript(INDEX_SCHEMA)
+        self.connection.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+        # Term prefixes and whether any search document changed since the
+        # search index was last written
+        self.changed_prefixes = set()
+        self.documents_changed = False
+
+    def close(self):
+        self.connection.close()
+
+    def paths(self, searchable=False):
+        # With searchable=True, only pages whose search terms are indexed
+        query = "SELECT path FROM pages WHERE searchable = 1" if searchable else "SELECT path FROM pages"
+        return {row[0] for row in self.connection.execute(query)}
+
+    def update(self, pages):
+        # pages is an iterable of (path, content_hash, output, metadata).
+        # Everything is written in one transaction. Search terms are stored
+        # for pages whose metadata collected them.
+        page_rows = []
+        tag_rows = []
+        link_rows = []
+        term_rows = []
+        searchable_paths = []
+        for path, content_hash, output, metadata in pages:
+            front_matter = metadata.front_matter
+            page_rows.append((
+                path,
+                content_hash,
+                output,
+                metadata.title,
+                _text_or_none(front_matter.get("summary", metadata.summary)),
+                _text_or_none(front_matter.get("date")),
+                _text_or_none(front_matter.get("updated")),
+                bool(front_matter.get("draft")),
+                metadata.word_count,
+                metadata.terms is not None,
+            ))
+            tag_rows.extend((path, str(tag)) for tag in _tag_list(front_matter.get("tags")))
+            link_rows.extend((path, "link", url) for url in metadata.links)
+            link_rows.extend((path, "image", url) for url in metadata.images)
+            if metadata.terms is not None:
+                searchable_paths.append(path)
+                term_rows.extend((path, term, term_prefix(term), count) for term, count in metadata.terms.items())
+
+        with self.connection:
+            self._delete([row[0] for row in page_rows], pages_too=False)
+            self._add_search_documents(searchable_paths)
+            self._remove_search_documents(row[0] for row in page_rows if not row[-1])
+            self.changed_prefixes.update(row[2] for row in term_rows)
+            self.connection.executemany("INSERT INTO terms (path, term, prefix, count) VALUES (?, ?, ?, ?)", term_rows)
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO pages ({', '.join(PAGE_COLUMNS)}) VALUES ({', '.join('?' * len(PAGE_COLUMNS))})",
+                page_rows,
+            )
+            self.connection.executemany("INSERT OR IGNORE INTO tags (path, tag) VALUES (?, ?)", tag_rows)
+            self.connection.executemany("INSERT INTO links (path, kind, target) VALUES (?, ?, ?)", link_rows)
+
+    def remove(self, paths):
+        with self.connection:
+            self._delete(list(paths))
+
+    def prune(self, seen):
+        # Drop pages whose source was not seen in this build
+        removed = sorted(self.paths() - set(seen))
+        if removed:
+            self.remove(removed)
+        return removed
+
+    def _delete(self, paths, pages_too=True):
+        rows = [(path,) for path in paths]
+        self.connection.executemany("DELETE FROM tags WHERE path = ?", rows)
+        self.connection.executemany("DELETE FROM links WHERE path = ?", rows)
+
+        # Postings that change with these pages
+        for path, in rows:
+            prefixes = self.connection.execute("SELECT DISTINCT prefix FROM terms WHERE path = ?", (path,))
+            self.changed_prefixes.update(prefix for prefix, in prefixes)
+        self.connection.executemany("DELETE FROM terms WHERE path = ?", rows)
+
+        if pages_too:
+            self.connection.executemany("DELETE FROM pages WHERE path = ?", rows)
+            self._remove_search_documents(paths)
+
+    def _remove_search_documents(self, paths):
+        before = self.connection.total_changes
+        self.connection.executemany("DELETE FROM search_documents WHERE path = ?", [(path,) for path in paths])
+        if self.connection.total_changes != before:
+            self.documents_changed = True
+
+    def _add_search_documents(self, paths):
+        # Give each new searchable page the next unused id. Ids stay stable
+        # while the page exists, so unrelated postings never change.
+        next_id = self.connection.execute("SELECT COALESCE(MAX(id), -1) + 1 FROM search_documents").fetchone()[0]
+        for path in paths:
+            if self.connection.execute("SELECT 1 FROM search_documents WHERE path = ?", (path,)).fetchone() is None:
+                self.connection.execute("INSERT INTO search_documents (path, id) VALUES (?, ?)", (path, next_id))
+                next_id += 1
+        if paths:
+            # Titles may have changed
+            self.documents_changed = True
+
+    def get(self, path):
+        row = self.connection.execute("SELECT * FROM pages WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        page = dict(row)
+        page["tags"] = self.tags_of(path)
+        return page
+
+    def pages(self, prefix="", include_drafts=False):
+        # Pages under a source path prefix, newest first
+        query = "SELECT * FROM pages WHERE path LIKE ? ESCAPE '\\'"
+        if not include_drafts:
+            query += " AND draft = 0"
+        query += " ORDER BY date DESC, path"
+        return [dict(row) for row in self.connection.execute(query, (_like_prefix(prefix),))]
+
+    def tags_of(self, path):
+        rows = self.connection.execute("SELECT tag FROM tags WHERE path = ? ORDER BY tag", (path,))
+        return [row[0] for row in rows]
+
+    def tag_counts(self):
+        rows = self.connection.execute("SELECT tag, COUNT(*) FROM tags GROUP BY tag ORDER BY tag")
+        return {tag: count for tag, count in rows}
+
+    def pages_with_tag(self, tag):
+        rows = self.connection.execute(
+            "SELECT pages.* FROM pages JOIN tags ON tags.path = pages.path WHERE tags.tag = ? ORDER BY date DESC, pages.path",
+            (tag,),
+        )
+        return [dict(row) for row in rows]
+
+    def links_from(self, path):
+        rows = self.connection.execute("SELECT kind, target FROM links WHERE path = ? ORDER BY rowid", (path,))
+        return [(kind, target) for kind, target in rows]
+
+    def all_links(self):
+        # Content path -> [(kind, target), ...] for every indexed page
+        links = {path: [] for path in self.paths()}
+        for path, kind, target in self.connection.execute("SELECT path, kind, target FROM links ORDER BY rowid"):
+            links[path].append((kind, target))
+        return links
+
+    def links_to(self, target):
+        rows = self.connection.execute("SELECT DISTINCT path FROM links WHERE target = ? ORDER BY path", (target,))
+        return [row[0] for row in rows]
+
+    def search_documents(self):
+        # Search document id -> (path, title)
+        rows = self.connection.execute(
+            "SELECT search_documents.id, pages.path, pages.title FROM search_documents "
+            "JOIN pages ON pages.path = search_documents.path ORDER BY search_documents.id"
+        )
+        return {doc_id: (path, title) for doc_id, path, title in rows}
+
+    def term_prefixes(self):
+        return {row[0] for row in self.connection.execute("SELECT DISTINCT prefix FROM terms")}
+
+    def postings(self, prefix):
+        # term -> [(document id, count), ...] for every term with this prefix
+        rows = self.connection.execute(
+            "SELECT terms.term, search_documents.id, terms.count FROM terms "
+            "JOIN search_documents ON search_documents.path = terms.path "
+            "WHERE terms.prefix = ? ORDER BY terms.term, search_documents.id",
+            (prefix,),
+        )
+        postings = {}
+        for term, doc_id, count in rows:
+            postings.setdefault(term, []).append((doc_id, count))
+        return postings
+
+
+def term_prefix(term):
+    return term[:TERM_PREFIX_LENGTH]
+
+
+def _text_or_none(value):
+    return None if value is None else str(value)
+
+
+def _tag_list(tags):
+    if tags is None:
+        return []
+    if isinstance(tags, str):
+        return [tags]
+    return tags
+
+
+def _like_prefix(prefix):
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
@@ -0,0 +1,126 @@
+import contextlib
+import json
+import os
+import socket
+import socketserver
+
+from linkcheck import format_report
+
+
+def default_socket_path(project_root):
+    return os.path.join(project_root, ".cache", "daemon.sock")
+
+
+def send_message(wfile, message):
+    # Messages are JSON objects, one per line
+    wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+    wfile.flush()
+
+
+class _OutputStream:
+    # stdout replacement that forwards each printed line to the client as
+    # soon as it is complete, so build progress streams back live. A client
+    # that goes away does not cancel the build; its output is dropped.
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.buffer = ""
+
+    def write(self, text):
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split("\n")
+        for line in lines:
+            self.send({"output": line})
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            self.send({"output": self.buffer})
+            self.buffer = ""
+
+    def send(self, message):
+        if self.wfile is None:
+            return
+        try:
+            send_message(self.wfile, message)
+        except OSError:
+            self.wfile = None
+
+
+class BuildRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line.strip():
+            # A connection probe, or a client that gave up before asking
+            return
+
+        output = _OutputStream(self.wfile)
+        try:
+            request = json.loads(line)
+            with contextlib.redirect_stdout(output):
+                response = self.server.dispatch(request)
+        except Exception as e:
+            # A failed build is reported to the client; the daemon and its
+            # caches stay up for the next request
+            response = {"error": f"{type(e).__name__}: {e}", "exit": 1}
+        output.flush()
+        output.send(response)
+
+
+class BuildServer(socketserver.UnixStreamServer):
+    # Serves one request at a time, so builds never overlap and the
+    # builder is only ever used from one thread
+    def __init__(self, socket_path, builder):
+        self.builder = builder
+        self.running = True
+        super().__init__(socket_path, BuildRequestHandler)
+
+    def dispatch(self, request):
+        command = request.get("command")
+        if command == "ping":
+            return {"exit": 0, "summary": "pong"}
+        if command == "stop":
+            self.running = False
+            return {"exit": 0, "summary": "stopping"}
+        if command == "render":
+            return {"exit": 0, "html": self.builder.render_one(request["path"])}
+
+        if command == "build":
+            result = self.builder.build(full=request.get("full", False))
+        elif command == "paths":
+            result = self.builder.build_paths(request["paths"])
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+        for line in format_report(result.broken):
+            print(line)
+        return {"exit": 1 if result.broken else 0, "summary": result.summary()}
+
+
+def serve(builder, socket_path):
+    # Answer build requests on socket_path until a client sends "stop"
+    _remove_stale_socket(socket_path)
+    socket_dir = os.path.dirname(socket_path)
+    if socket_dir:
+        os.makedirs(socket_dir, exist_ok=True)
+
+    with BuildServer(socket_path, builder) as server:
+        print(f"Build daemon listening on {socket_path}")
+        try:
+            while server.running:
+                server.handle_request()
+        finally:
+            os.unlink(socket_path)
+
+
+def _remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(socket_path)
+            return
+    raise RuntimeError(f"A build daemon is already listening on {socket_path}")
@@ -0,0 +1,106 @@
+import os
+import stat
+from bisect import bisect_left, insort
+
+
+class SourceFile:
+    # A file found by scan_tree, with the stat result taken while scanning
+    # so later stages never stat it again
+    __slots__ = ("path", "rel_path", "stat")
+
+    def __init__(self, path, rel_path, stat):
+        self.path = path
+        self.rel_path = rel_path
+        self.stat = stat
+
+    def __eq__(self, other):
+        return self.path == other.path and self.rel_path == other.rel_path and self.stat == other.stat
+
+    def __repr__(self):
+        return f"SourceFile({self.path}, {self.rel_path})"
+
+
+class SourceTree:
+    def __init__(self, root, directories, files):
+        # directories are paths relative to root, parents before children;
+        # files are SourceFiles sorted by relative path
+        self.root = root
+        self.directories = directories
+        self.files = files
+        # Kept in step with the lists above so refresh() costs a bisect and
+        # a set lookup rather than a pass over the whole tree
+        self._rel_paths = [source.rel_path for source in files]
+        self._directory_set = set(directories)
+
+    def refresh(self, rel_path):
+        # Re-stat one file after it changed on disk, adding, replacing or
+        # dropping its record. Returns the new SourceFile, or None when the
+        # file is gone.
+        path = os.path.join(self.root, rel_path)
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
+            file_stat = None
+
+        i = bisect_left(self._rel_paths, rel_path)
+        exists = i < len(self._rel_paths) and self._rel_paths[i] == rel_path
+
+        if file_stat is None or stat.S_ISDIR(file_stat.st_mode):
+            if exists:
+                del self.files[i]
+                del self._rel_paths[i]
+            return None
+
+        source = SourceFile(path, rel_path, file_stat)
+        if exists:
+            self.files[i] = source
+        else:
+            self.files.insert(i, source)
+            self._rel_paths.insert(i, rel_path)
+            parent = os.path.dirname(rel_path)
+            while parent and parent not in self._directory_set:
+                self._directory_set.add(parent)
+                insort(self.directories, parent)
+                parent = os.path.dirname(parent)
+        return source
+
+    def __repr__(self):
+        return f"SourceTree({self.root}, {len(self.directories)} directories, {len(self.files)} files)"
+
+
+def scan_tree(root):
+    # Walk root with os.scandir. Directories are recognised from the
+    # directory listing itself, so only files cost a stat call. A missing
+    # root is an empty tree; dangling symlinks are skipped.
+    directories = []
+    files = []
+    pending = [""]
+
+    while pending:
+        rel_dir = pending.pop()
+        dir_path = os.path.join(root, rel_dir) if rel_dir else root
+        try:
+            entries = os.scandir(dir_path)
+        except FileNotFoundError:
+            if rel_dir:
+                raise
+            break
+
+        with entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                if entry.is_dir():
+                    directories.append(rel_path)
+                    pending.append(rel_path)
+                    continue
+                try:
+                    file_stat = entry.stat()
+                except FileNotFoundError:
+                    # Points nowhere, like an editor's .#name lock file
+                    continue
+                files.append(SourceFile(entry.path, rel_path, file_stat))
+
+    # Sorted for a deterministic order whatever the filesystem returns
+    directories.sort()
+    files.sort(key=lambda source: source.rel_path)
+    return SourceTree(root, directories, files)
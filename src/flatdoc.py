@@ -0,0 +1,187 @@
+import io
+from array import array
+from htmlnode import escape_attribute, escape_text
+from textnode import BlockType, TextType, iter_markdown_blocks, classify_block, text_to_textnodes
+
+# Node kinds
+ELEMENT = 0  # tag wrapping the nodes up to end[i]
+LEAF = 1     # tag wrapping the node's text
+TEXT = 2     # bare text
+LINK = 3     # <a> with href from the url span
+IMAGE = 4    # <img> with src from the url span and alt from the text span
+
+TAGS = ("div", "p", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "code", "blockquote", "ul", "ol", "li", "b", "i", "a", "img")
+TAG_IDS = {tag: tag_id for tag_id, tag in enumerate(TAGS)}
+
+INLINE_TAGS = {
+    TextType.BOLD: TAG_IDS["b"],
+    TextType.ITALIC: TAG_IDS["i"],
+    TextType.CODE: TAG_IDS["code"],
+}
+
+
+class FlatDocument:
+    # A document stored as parallel arrays in pre-order instead of a tree of
+    # node objects. Node i's descendants are nodes i + 1 .. end[i] - 1. Text
+    # and URLs are (start, end) spans into one shared text buffer, which
+    # holds the document's text after markup is removed.
+    def __init__(self):
+        self.kind = array('B')
+        self.tag = array('B')
+        self.end = array('I')
+        self.text_start = array('I')
+        self.text_end = array('I')
+        self.url_start = array('I')
+        self.url_end = array('I')
+        self.text = ""
+        self._buffer = io.StringIO()
+        self._buffer_length = 0
+
+    def __len__(self):
+        return len(self.kind)
+
+    def _append_text(self, text):
+        start = self._buffer_length
+        self._buffer.write(text)
+        self._buffer_length += len(text)
+        return start, self._buffer_length
+
+    def _add_node(self, kind, tag_id, text="", url=""):
+        text_start, text_end = self._append_text(text)
+        url_start, url_end = self._append_text(url)
+        self.kind.append(kind)
+        self.tag.append(tag_id)
+        self.end.append(len(self.kind))
+        self.text_start.append(text_start)
+        self.text_end.append(text_end)
+        self.url_start.append(url_start)
+        self.url_end.append(url_end)
+        return len(self.kind) - 1
+
+    def open_element(self, tag):
+        return self._add_node(ELEMENT, TAG_IDS[tag])
+
+    def close_element(self, index):
+        self.end[index] = len(self.kind)
+
+    def add_leaf(self, tag, text):
+        return self._add_node(LEAF, TAG_IDS[tag], text)
+
+    def add_text_nodes(self, text):
+        text_nodes = text_to_textnodes(text)
+        for text_node in text_nodes:
+            text_type = text_node.text_type
+            if text_type == TextType.TEXT:
+                self._add_node(TEXT, 0, text_node.text)
+            elif text_type == TextType.LINK:
+                self._add_node(LINK, TAG_IDS["a"], text_node.text, text_node.url or "")
+            elif text_type == TextType.IMAGE:
+                self._add_node(IMAGE, TAG_IDS["img"], text_node.text, text_node.url or "")
+            elif text_type in INLINE_TAGS:
+                self._add_node(LEAF, INLINE_TAGS[text_type], text_node.text)
+            else:
+                raise ValueError(f"Unsupported text type: {text_type}")
+        return text_nodes
+
+    def finish(self):
+        self.text = self._buffer.getvalue()
+        self._buffer = None
+        return self
+
+    def write_html(self, sink, basepath="/"):
+        # Emit the same HTML as the equivalent ParentNode tree, using an
+        # explicit stack of open elements rather than recursion
+        text = self.text
+        open_elements = []
+
+        for i in range(len(self.kind)):
+            while open_elements and open_elements[-1][0] <= i:
+                sink.write(f"</{open_elements.pop()[1]}>")
+
+            kind = self.kind[i]
+            tag = TAGS[self.tag[i]]
+            value = text[self.text_start[i]:self.text_end[i]]
+
+            if kind == ELEMENT:
+                sink.write(f"<{tag}>")
+                open_elements.append((self.end[i], tag))
+            elif kind == TEXT:
+                sink.write(escape_text(value))
+            elif kind == LEAF:
+                sink.write(f"<{tag}>{escape_text(value)}</{tag}>")
+            else:
+                url = text[self.url_start[i]:self.url_end[i]]
+                if basepath != "/" and url.startswith("/"):
+                    url = basepath + url[1:]
+                if kind == LINK:
+                    sink.write(f'<a href="{escape_attribute(url)}">{escape_text(value)}</a>')
+                else:
+                    sink.write(f'<img src="{escape_attribute(url)}" alt="{escape_attribute(value)}"></img>')
+
+        while open_elements:
+            sink.write(f"</{open_elements.pop()[1]}>")
+
+    def to_html(self, basepath="/"):
+        sink = io.StringIO()
+        self.write_html(sink, basepath)
+        return sink.getvalue()
+
+
+def markdown_to_flat_document(markdown, metadata=None):
+    # Flat counterpart of markdown_to_html_node. Pass a DocumentMetadata to
+    # have it filled in during the same pass.
+    document = FlatDocument()
+    root = document.open_element("div")
+
+    for block in iter_markdown_blocks(markdown):
+        block_type, lines = classify_block(block)
+        if metadata is not None:
+            metadata.add_block(block_type, block, lines)
+
+        if block_type == BlockType.PARAGRAPH:
+            element = document.open_element("p")
+            text_nodes = document.add_text_nodes(block.replace("\n", " "))
+            if metadata is not None and metadata.summary is None:
+                metadata.add_paragraph(
+                    (node.text, node.text_type == TextType.LINK) for node in text_nodes if node.text_type != TextType.IMAGE
+                )
+        elif block_type == BlockType.HEADING:
+            level = len(block) - len(block.lstrip("#"))
+            element = document.open_element(f"h{level}")
+            document.add_text_nodes(block[level + 1:])
+        elif block_type == BlockType.CODE:
+            element = document.open_element("pre")
+            document.add_leaf("code", block[4:-3])
+        elif block_type == BlockType.QUOTE:
+            element = document.open_element("blockquote")
+            document.add_text_nodes("\n".join(line[1:].lstrip() for line in lines))
+        elif block_type == BlockType.UNORDERED_LIST or block_type == BlockType.ORDERED_LIST:
+            element = document.open_element("ul" if block_type == BlockType.UNORDERED_LIST else "ol")
+            for line in lines:
+                item = document.open_element("li")
+                if block_type == BlockType.UNORDERED_LIST:
+                    document.add_text_nodes(line[2:])
+                else:
+                    document.add_text_nodes(line[line.find(". ") + 2:])
+                document.close_element(item)
+        else:
+            raise ValueError(f"Invalid block type: {block_type}")
+
+        document.close_element(element)
+
+    document.close_element(root)
+    document.finish()
+
+    if metadata is not None:
+        text = document.text
+        parts = []
+        for i, kind in enumerate(document.kind):
+            if kind == LINK or kind == IMAGE:
+                url = text[document.url_start[i]:document.url_end[i]]
+                (metadata.links if kind == LINK else metadata.images).append(url)
+            # Image alt text is an attribute, not page text
+            if metadata.terms is not None and kind != ELEMENT and kind != IMAGE:
+                parts.append(text[document.text_start[i]:document.text_end[i]])
+        if metadata.terms is not None:
+            metadata.add_text(" ".join(parts))
+    return document
@@ -0,0 +1,108 @@
+import datetime
+import io
+import re
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+YAML_DELIMITER = "---"
+TOML_DELIMITER = "+++"
+
+INTEGER_PATTERN = re.compile(r"[-+]?[0-9]+")
+DATE_PATTERN = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+
+def read_front_matter(source):
+    # Parse the front matter at the top of source, a string or a text file,
+    # reading only up to the closing delimiter. A file is left positioned at
+    # the first body line, so the body can be rendered from it afterwards or
+    # not read at all. Returns {} when the source has no front matter.
+    if isinstance(source, str):
+        source = io.StringIO(source)
+
+    start = source.tell()
+    delimiter = source.readline().rstrip()
+    if delimiter not in (YAML_DELIMITER, TOML_DELIMITER):
+        source.seek(start)
+        return {}
+
+    header = []
+    while True:
+        line = source.readline()
+        if not line:
+            raise ValueError(f"Invalid front matter: missing closing '{delimiter}'")
+        if line.rstrip() == delimiter:
+            break
+        header.append(line)
+
+    if delimiter == TOML_DELIMITER:
+        return parse_toml("".join(header))
+    return parse_yaml_lite("".join(header))
+
+
+def parse_toml(text):
+    if tomllib is None:
+        raise ValueError("Invalid front matter: TOML front matter requires Python 3.11 or later")
+    return tomllib.loads(text)
+
+
+def parse_yaml_lite(text):
+    # The subset of YAML front matter is written in: "key: value" pairs whose
+    # values are scalars or [inline, lists], and "- item" lines continuing
+    # the list of a key with an empty value
+    data = {}
+    key = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        if stripped == "-" or stripped.startswith("- "):
+            if key is None or not (data[key] is None or isinstance(data[key], list)):
+                raise ValueError(f"Invalid front matter: list item without a key in '{line}'")
+            if data[key] is None:
+                data[key] = []
+            data[key].append(_parse_scalar(stripped[1:].strip()))
+            continue
+
+        name, separator, value = line.partition(":")
+        if not separator or not name.strip():
+            raise ValueError(f"Invalid front matter: expected 'key: value' in '{line}'")
+        key = name.strip()
+        data[key] = _parse_value(value.strip())
+
+    return data
+
+
+def _parse_value(value):
+    if not value:
+        return None
+    if value.startswith("[") and value.endswith("]"):
+        items = value[1:-1].strip()
+        if not items:
+            return []
+        return [_parse_scalar(item.strip()) for item in items.split(",")]
+    return _parse_scalar(value)
+
+
+def _parse_scalar(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    lowered = value.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    if lowered in ("null", "~", ""):
+        return None
+    if INTEGER_PATTERN.fullmatch(value):
+        return int(value)
+    if DATE_PATTERN.fullmatch(value):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
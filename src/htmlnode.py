@@ -1,60 +1,197 @@
+import sys
+from functools import lru_cache
+
+# Attributes holding site-absolute URLs that must honour the basepath
+URL_ATTRIBUTES = ("href", "src")
+
+TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+ATTRIBUTE_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+
+def escape_text(text):
+    # Most text contains none of these, and the substring checks are much
+    # cheaper than translate()
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.translate(TEXT_ESCAPES)
+
+
+def escape_attribute(value):
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return value.translate(ATTRIBUTE_ESCAPES)
+
+
+@lru_cache(maxsize=4096)
+def _serialize_props(items, basepath):
+    # Links on a page repeat the same few attribute sets, so serialized
+    # strings are cached by (props items, basepath)
+    html_attrs = []
+    for key, value in items:
+        value = str(value)
+        if basepath != "/" and key in URL_ATTRIBUTES and value.startswith("/"):
+            value = basepath + value[1:]
+        html_attrs.append(f' {key}="{escape_attribute(value)}"')
+    return "".join(html_attrs)
+
+
 class HTMLNode:
+    # Slots instead of a per-instance __dict__: large pages create hundreds
+    # of thousands of nodes
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        # Equal tag strings share one object, and empty props are stored as
+        # None so no node holds an empty dict
+        self.tag = sys.intern(tag) if type(tag) is str else tag
         self.value = value
         self.children = children
-        self.props = props
+        self.props = props if props else None
 
-    def to_html(self):
+    def to_html(self, basepath="/"):
         raise NotImplementedError("to_html method must be implemented by subclasses")
 
-    def props_to_html(self):
+    def write_html(self, sink, basepath="/"):
+        # Stream this node's HTML into anything with a write() method
+        sink.write(self.to_html(basepath))
+
+    def props_to_html(self, basepath="/"):
         if self.props is None or len(self.props) == 0:
             return ""
 
-        html_attrs = ""
-        for key, value in self.props.items():
-            html_attrs += f' {key}="{value}"'
+        items = tuple(self.props.items())
+        try:
+            return _serialize_props(items, basepath)
+        except TypeError:
+            # Unhashable prop values cannot be cached
+            return _serialize_props.__wrapped__(items, basepath)
 
-        return html_attrs
+    def _repr_parts(self):
+        # (text before the children, children, text after the children)
+        return f"HTMLNode({self.tag}, {self.value}, children: ", self.children, f", {self.props})"
 
     def __repr__(self):
-        return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
+        # Built with an explicit stack so deeply nested trees cannot hit the
+        # recursion limit
+        parts = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if type(item) is str:
+                parts.append(item)
+                continue
+
+            if not isinstance(item, HTMLNode) or isinstance(item, LeafNode):
+                # Leaves have no children to walk
+                parts.append(repr(item))
+                continue
+
+            head, children, tail = item._repr_parts()
+            parts.append(head)
+            stack.append(tail)
+            if isinstance(children, list):
+                # Same layout as list.__repr__: [a, b, c]
+                stack.append("]")
+                for index in range(len(children) - 1, -1, -1):
+                    stack.append(children[index])
+                    if index:
+                        stack.append(", ")
+                stack.append("[")
+            else:
+                stack.append(f"{children}")
+        return "".join(parts)
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
+    def to_html(self, basepath="/"):
         if self.value is None:
             raise ValueError("All leaf nodes must have a value")
 
         if self.tag is None:
-            return self.value
+            return escape_text(self.value)
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html(basepath)}>{escape_text(self.value)}</{self.tag}>"
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
-        if self.tag is None:
-            raise ValueError("All parent nodes must have a tag")
-
-        if self.children is None:
-            raise ValueError("All parent nodes must have children")
-
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
-
-    def __repr__(self):
-        return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
\ No newline at end of file
+    def to_html(self, basepath="/"):
+        parts = []
+        self._emit_html(parts.append, basepath)
+        return "".join(parts)
+
+    def write_html(self, sink, basepath="/"):
+        # Fragments go straight into the sink, so no level of the tree
+        # builds or copies its subtree as a string
+        self._emit_html(sink.write, basepath)
+
+    def _emit_html(self, write, basepath):
+        # Depth-first walk with an explicit stack of (children iterator,
+        # closing tag) instead of recursion, so nesting depth is unlimited.
+        # Most elements (paragraphs, list items, headings) hold only leaves;
+        # those are rendered inline in one piece without touching the stack.
+        leaf_type = LeafNode
+        escapes = TEXT_ESCAPES
+        stack = [(iter((self,)), "")]
+        while stack:
+            children, closing_tag = stack[-1]
+            for child in children:
+                if not isinstance(child, ParentNode):
+                    write(child.to_html(basepath))
+                    continue
+
+                tag = child.tag
+                if tag is None:
+                    raise ValueError("All parent nodes must have a tag")
+                grandchildren = child.children
+                if grandchildren is None:
+                    raise ValueError("All parent nodes must have children")
+                if child.props is None:
+                    opening = f"<{tag}>"
+                else:
+                    opening = f"<{tag}{child.props_to_html(basepath)}>"
+
+                inner = []
+                for leaf in grandchildren:
+                    if type(leaf) is not leaf_type:
+                        break
+                    # LeafNode.to_html, inlined
+                    value = leaf.value
+                    if value is None:
+                        raise ValueError("All leaf nodes must have a value")
+                    if "&" in value or "<" in value or ">" in value:
+                        value = value.translate(escapes)
+                    leaf_tag = leaf.tag
+                    if leaf_tag is None:
+                        inner.append(value)
+                    elif leaf.props is None:
+                        inner.append(f"<{leaf_tag}>{value}</{leaf_tag}>")
+                    else:
+                        inner.append(f"<{leaf_tag}{leaf.props_to_html(basepath)}>{value}</{leaf_tag}>")
+                else:
+                    write(f"{opening}{''.join(inner)}</{tag}>")
+                    continue
+
+                # Nested elements: descend, finishing this one later
+                write(opening)
+                stack.append((iter(grandchildren), f"</{tag}>"))
+                break
+            else:
+                # All children written: close this element
+                write(closing_tag)
+                stack.pop()
+
+    def _repr_parts(self):
+        return f"ParentNode({self.tag}, children: ", self.children, f", {self.props})"
@@ -0,0 +1,80 @@
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+
+def site_paths(rel_path):
+    # URL paths that serve the output file at rel_path (relative to the
+    # output root, "/"-separated)
+    paths = ["/" + rel_path]
+    if rel_path == "index.html":
+        paths.append("/")
+    elif rel_path.endswith("/index.html"):
+        directory = "/" + rel_path[:-len("/index.html")]
+        paths.extend((directory, directory + "/"))
+    elif rel_path.endswith(".html"):
+        paths.append("/" + rel_path[:-len(".html")])
+    return paths
+
+
+def build_known_paths(dest_dir_path, outputs, static_tree=None):
+    # Every URL path the built site serves, from the generated outputs
+    # (absolute paths under dest_dir_path) and the scan_tree() of static/,
+    # without reading anything back from the output tree
+    known = set()
+    for output_path in outputs:
+        rel_path = os.path.relpath(output_path, dest_dir_path).replace(os.sep, "/")
+        known.update(site_paths(rel_path))
+
+    if static_tree is not None:
+        for source in static_tree.files:
+            known.update(site_paths(source.rel_path.replace(os.sep, "/")))
+
+    return known
+
+
+def page_base(rel_path):
+    # URL directory that relative links resolve against in the page from
+    # the content path rel_path. Pages render next to their source, so this
+    # is the source's directory for both blog/tom/index.md and blog/tom.md.
+    directory = posixpath.dirname(rel_path.replace(os.sep, "/"))
+    return "/" + directory + "/" if directory else "/"
+
+
+def resolve_link(url, base):
+    # URL path an internal link points at, or None for external links,
+    # other schemes and same-page fragments
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+
+    path = unquote(parts.path)
+    if not path.startswith("/"):
+        path = base + path
+    resolved = posixpath.normpath(path)
+    if path.endswith("/") and resolved != "/":
+        resolved += "/"
+    return resolved
+
+
+def check_links(links_by_page, known_paths):
+    # links_by_page maps content paths to the (kind, url) pairs collected
+    # while rendering them. Returns {content path: [(kind, url), ...]} for
+    # the links whose target the site does not serve.
+    broken = {}
+    for rel_path in sorted(links_by_page):
+        base = page_base(rel_path)
+        for kind, url in links_by_page[rel_path]:
+            target = resolve_link(url, base)
+            if target is not None and target not in known_paths:
+                broken.setdefault(rel_path, []).append((kind, url))
+    return broken
+
+
+def format_report(broken):
+    lines = []
+    for rel_path, links in broken.items():
+        lines.append(f"{rel_path}:")
+        for kind, url in links:
+            lines.append(f"  broken {kind}: {url}")
+    return lines
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import re
+
+from htmlnode import LeafNode, ParentNode, escape_text
+from manifest import atomic_write
+from template import load_template
+
+POSTS_PER_PAGE = 10
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+class ListingPage:
+    def __init__(self, path, title, entries, newer_url=None, older_url=None):
+        # path is the output path relative to the destination root; entries
+        # are (url, title, summary, date) tuples taken from page metadata
+        self.path = path
+        self.title = title
+        self.entries = entries
+        self.newer_url = newer_url
+        self.older_url = older_url
+
+    def signature(self, template_hash, basepath):
+        # Changes whenever anything shown on this page changes, so a post
+        # edit only regenerates the listings it appears on
+        data = [self.title, self.entries, self.newer_url, self.older_url, template_hash, basepath]
+        return hashlib.sha256(json.dumps(data).encode("utf-8")).hexdigest()
+
+    def to_html_node(self):
+        children = [LeafNode("h1", self.title)]
+
+        items = []
+        for url, title, summary, date in self.entries:
+            item = [LeafNode("a", title or url, {"href": url})]
+            if date:
+                item.append(LeafNode("time", date, {"datetime": date}))
+            if summary:
+                item.append(LeafNode("p", summary))
+            items.append(ParentNode("li", item))
+        if items:
+            children.append(ParentNode("ul", items))
+
+        links = []
+        if self.newer_url:
+            links.append(LeafNode("a", "Newer", {"href": self.newer_url, "rel": "prev"}))
+        if self.older_url:
+            links.append(LeafNode("a", "Older", {"href": self.older_url, "rel": "next"}))
+        if links:
+            children.append(ParentNode("nav", links))
+
+        return ParentNode("div", children)
+
+    def __eq__(self, other):
+        return (
+            self.path == other.path
+            and self.title == other.title
+            and self.entries == other.entries
+            and self.newer_url == other.newer_url
+            and self.older_url == other.older_url
+        )
+
+    def __repr__(self):
+        return f"ListingPage({self.path}, {self.title}, {self.entries}, {self.newer_url}, {self.older_url})"
+
+
+def page_url(rel_path):
+    # Site-absolute URL of the page generated from a content path, in the
+    # form the content links use ("/blog/tom" for blog/tom/index.md)
+    stem = rel_path[:-3].replace(os.sep, "/")
+    if stem == "index":
+        return "/"
+    if stem.endswith("/index"):
+        return "/" + stem[:-len("/index")]
+    return "/" + stem + ".html"
+
+
+def tag_slug(tag):
+    return SLUG_PATTERN.sub("-", tag.lower()).strip("-") or "tag"
+
+
+def paginate(section, title, entries, per_page=POSTS_PER_PAGE):
+    # Split entries into pages at section/index.html,
+    # section/page/2/index.html, ...; an empty section still gets a page
+    chunks = [entries[i:i + per_page] for i in range(0, len(entries), per_page)] or [[]]
+    urls = [f"/{section}" if number == 1 else f"/{section}/page/{number}" for number in range(1, len(chunks) + 1)]
+
+    pages = []
+    for i, chunk in enumerate(chunks):
+        number = i + 1
+        path = f"{section}/index.html" if number == 1 else f"{section}/page/{number}/index.html"
+        pages.append(ListingPage(
+            path,
+            title if number == 1 else f"{title} (page {number})",
+            chunk,
+            urls[i - 1] if i > 0 else None,
+            urls[i + 1] if number < len(chunks) else None,
+        ))
+    return pages
+
+
+def plan_listings(index, section="blog", per_page=POSTS_PER_PAGE):
+    # Every listing page for the posts under content/<section>/, one set of
+    # pages per tag, and a tag overview, built from the content index alone
+    posts = _sorted_pages(index.pages(section + "/"))
+    listings = paginate(section, section.capitalize(), [_entry(page) for page in posts], per_page)
+
+    # Tags whose names map to the same slug share a page
+    tagged = {}
+    for tag in index.tag_counts():
+        pages = [page for page in index.pages_with_tag(tag) if not page["draft"]]
+        if pages:
+            name, slug_pages = tagged.setdefault(tag_slug(tag), (tag, {}))
+            for page in pages:
+                slug_pages[page["path"]] = page
+
+    overview = []
+    for slug in sorted(tagged):
+        name, pages = tagged[slug]
+        entries = [_entry(page) for page in _sorted_pages(list(pages.values()))]
+        listings.extend(paginate(f"tags/{slug}", f"Tagged “{name}”", entries, per_page))
+        count = len(entries)
+        overview.append((f"/tags/{slug}", name, f"{count} page{'s' if count != 1 else ''}", None))
+    if overview:
+        listings.append(ListingPage("tags/index.html", "Tags", overview))
+
+    return listings
+
+
+def generate_listings(index, template_path, dest_dir_path, basepath="/", manifest=None, template_hash=None, section="blog", per_page=POSTS_PER_PAGE, skip=()):
+    # Write the listing pages whose contents changed and remove those that
+    # no longer exist. Outputs in skip (pages rendered from content files)
+    # are never overwritten. Returns the paths written.
+    template = load_template(template_path).with_basepath(basepath)
+    skip = set(skip)
+    current = set()
+    written = []
+
+    for listing in plan_listings(index, section, per_page):
+        dest_path = os.path.join(dest_dir_path, *listing.path.split("/"))
+        if dest_path in skip:
+            continue
+        current.add(dest_path)
+
+        signature = listing.signature(template_hash, basepath)
+        if manifest is not None and manifest.listing_is_fresh(dest_path, signature):
+            continue
+
+        print(f"Generating listing {dest_path}")
+        _write_listing(listing, template, dest_path, basepath)
+        written.append(dest_path)
+        if manifest is not None:
+            manifest.record_listing(dest_path, signature)
+
+    if manifest is not None:
+        for removed_path in manifest.prune_listings(current, dest_dir_path):
+            print(f"Removed stale listing: {removed_path}")
+
+    return written
+
+
+def _write_listing(listing, template, dest_path, basepath):
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+    content = listing.to_html_node()
+    with atomic_write(dest_path) as f:
+        template.write(f, Title=escape_text(listing.title), Content=lambda sink: content.write_html(sink, basepath))
+
+
+def _entry(page):
+    return (page_url(page["path"]), page["title"], page["summary"], page["date"])
+
+
+def _sorted_pages(pages):
+    # Newest first, undated pages last, ties by path
+    pages = sorted(pages, key=lambda page: page["path"])
+    pages.sort(key=lambda page: page["date"] or "", reverse=True)
+    return pages
@@ -1,10 +1,40 @@
+import argparse
+import io
 import os
-import shutil
 import sys
-from textnode import TextNode, TextType, markdown_to_html_node, extract_title
-
+import shutil
+import stat
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contentindex import ContentIndex
+from daemon import default_socket_path, serve
+from discovery import scan_tree
+from flatdoc import markdown_to_flat_document
+from frontmatter import read_front_matter
+from htmlnode import escape_text
+from linkcheck import build_known_paths, check_links, format_report
+from listings import generate_listings
+from manifest import BuildManifest, atomic_write, hash_file
+from publish import Publisher, PUBLISH_MODES
+from searchindex import search_outputs, write_search_index
+from template import load_template
+from watcher import watch
+from textnode import DocumentMetadata, TextNode, TextType, write_markdown_html
+
+# Rendered page content is held in memory up to this size before spilling
+# to a temporary file
+CONTENT_SPOOL_SIZE = 1 << 20
+
+# Characters of rendered content a SiteBuilder keeps between builds
+CONTENT_CACHE_SIZE = 64 << 20
+
+
+def copy_static_to_public(src_path, dest_path, publisher=None, tree=None):
+    # tree is the scan_tree() of src_path, if the caller already has it
+    if tree is None:
+        tree = scan_tree(src_path)
 
-def copy_static_to_public(src_path, dest_path):
     # Remove destination directory if it exists
     if os.path.exists(dest_path):
         print(f"Removing existing directory: {dest_path}")
@@ -14,119 +44,598 @@ def copy_static_to_public(src_path, dest_path):
     print(f"Creating directory: {dest_path}")
     os.mkdir(dest_path)
 
-    # Copy all files and directories recursively
-    _copy_directory_contents(src_path, dest_path)
-
-
-def _copy_directory_contents(src_path, dest_path):
-    # List all items in the source directory
-    items = os.listdir(src_path)
-
-    for item in items:
-        src_item_path = os.path.join(src_path, item)
-        dest_item_path = os.path.join(dest_path, item)
-
-        if os.path.isfile(src_item_path):
-            # Copy file
-            print(f"Copying file: {src_item_path} -> {dest_item_path}")
-            shutil.copy(src_item_path, dest_item_path)
-        else:
-            # Create subdirectory and recursively copy its contents
-            print(f"Creating directory: {dest_item_path}")
-            os.mkdir(dest_item_path)
-            _copy_directory_contents(src_item_path, dest_item_path)
-
-
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+    publisher = publisher or Publisher()
+
+    # Directories come before their contents
+    for rel_dir in tree.directories:
+        dest_dir_path = os.path.join(dest_path, rel_dir)
+        print(f"Creating directory: {dest_dir_path}")
+        os.mkdir(dest_dir_path)
+
+    for source in tree.files:
+        # Copy file, keeping its mtime so a later sync sees it as current
+        dest_item_path = os.path.join(dest_path, source.rel_path)
+        print(f"Copying file: {source.path} -> {dest_item_path}")
+        publisher.publish(source.path, dest_item_path)
+
+
+def sync_static_to_public(src_path, dest_path, keep=(), checksum=False, publisher=None, tree=None):
+    # rsync-style update of dest_path: copy only new or changed files and
+    # delete files that belong neither to static/ nor to the paths in keep
+    # (the generated pages). Returns the number of files copied.
+    if tree is None:
+        tree = scan_tree(src_path)
+    keep = {os.path.abspath(path) for path in keep}
+    publisher = publisher or Publisher()
+
+    if not os.path.isdir(dest_path):
+        print(f"Creating directory: {dest_path}")
+        os.makedirs(dest_path)
+
+    for rel_dir in tree.directories:
+        dest_dir_path = os.path.join(dest_path, rel_dir)
+        dest_stat = _stat_or_none(dest_dir_path)
+        if dest_stat is not None and not stat.S_ISDIR(dest_stat.st_mode):
+            os.remove(dest_dir_path)
+            dest_stat = None
+        if dest_stat is None:
+            print(f"Creating directory: {dest_dir_path}")
+            os.mkdir(dest_dir_path)
+
+    copied = 0
+    for source in tree.files:
+        dest_item_path = os.path.join(dest_path, source.rel_path)
+        dest_stat = _stat_or_none(dest_item_path)
+        if dest_stat is not None and stat.S_ISDIR(dest_stat.st_mode):
+            shutil.rmtree(dest_item_path)
+            dest_stat = None
+
+        if _file_changed(source, dest_item_path, dest_stat, checksum):
+            print(f"Copying file: {source.path} -> {dest_item_path}")
+            publisher.publish(source.path, dest_item_path)
+            copied += 1
+
+    # Anything in the destination without a static counterpart is an orphan
+    # unless it is (or contains) a generated page
+    expected = set(tree.directories)
+    expected.update(source.rel_path for source in tree.files)
+    _remove_orphans(dest_path, "", expected, keep)
+
+    return copied
+
+
+def _stat_or_none(path):
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _file_changed(source, dest_path, dest_stat, checksum):
+    if dest_stat is None:
+        return True
+
+    src_stat = source.stat
+    if (src_stat.st_dev, src_stat.st_ino) == (dest_stat.st_dev, dest_stat.st_ino):
+        # Already hardlinked to the source
+        return False
+
+    if src_stat.st_size != dest_stat.st_size:
+        return True
+
+    if checksum or dest_stat.st_nlink > 1:
+        # A --dedupe link to an identical file carries that file's mtime,
+        # so only the content says whether it is still up to date
+        return hash_file(source.path) != hash_file(dest_path)
+
+    return src_stat.st_mtime_ns != dest_stat.st_mtime_ns
+
+
+def _remove_orphans(dir_path, rel_dir, expected, keep):
+    with os.scandir(dir_path) as scanned:
+        entries = list(scanned)
+
+    for entry in entries:
+        rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+        if entry.is_dir(follow_symlinks=False):
+            _remove_orphans(entry.path, rel_path, expected, keep)
+            if rel_path not in expected:
+                try:
+                    os.rmdir(entry.path)
+                except OSError:
+                    # Still holds generated pages
+                    continue
+                print(f"Removing orphaned directory: {entry.path}")
+        elif rel_path not in expected and os.path.abspath(entry.path) not in keep:
+            print(f"Removing orphaned file: {entry.path}")
+            os.remove(entry.path)
+
+
+class ContentCache:
+    # Rendered page content and metadata keyed by the source path, its
+    # content hash and the render options, least recently used first. Bounded by the total length of the
+    # cached content, so a long-lived builder can re-wrap unchanged pages in
+    # a new template without parsing them again.
+    def __init__(self, max_size=CONTENT_CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, content, metadata):
+        if len(content) > self.max_size:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old[0])
+        self._entries[key] = (content, metadata)
+        self.size += len(content)
+
+        while self.size > self.max_size:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+def render_page_content(source, sink, basepath="/", compact_ast=False, search=False):
+    # Render the markdown file object source into sink and return its
+    # DocumentMetadata. With search set, the page's search terms are
+    # collected as it renders.
+    metadata = DocumentMetadata(collect_terms=search)
+
+    # Front matter is consumed here so only the body is rendered
+    metadata.front_matter = read_front_matter(source)
+
+    # Stream markdown blocks through one at a time, or build the whole page
+    # as a compact array-backed document first
+    if compact_ast:
+        markdown_to_flat_document(source, metadata).write_html(sink, basepath)
+    else:
+        write_markdown_html(source, sink, basepath, metadata)
+
+    # A title in the front matter takes precedence over the first h1
+    title = metadata.front_matter.get("title")
+    if title is not None:
+        metadata.title = str(title)
+    if metadata.title is None:
+        raise Exception("No h1 header found")
+
+    return metadata
+
+
+def _render_cached(from_path, content_hash, cache, basepath, compact_ast, search):
+    # basepath shapes the content and search the metadata, so a builder
+    # whose options change never reuses a render made under the old ones
+    cache_key = (from_path, content_hash, basepath, compact_ast, search)
+    cached = cache.get(cache_key)
+    if cached is None:
+        content = io.StringIO()
+        with open(from_path, 'r', encoding='utf-8') as source:
+            metadata = render_page_content(source, content, basepath, compact_ast, search)
+        cached = (content.getvalue(), metadata)
+        cache.put(cache_key, *cached)
+    return cached
+
+
+def write_page(dest_path, template, title, write_content):
+    # A failed render leaves the previous page in place
+    with atomic_write(dest_path) as f:
+        template.write(f, Title=escape_text(title), Content=write_content)
+
+
+def generate_page(from_path, template_path, dest_path, basepath="/", compact_ast=False, search=False, cache=None, content_hash=None):
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
-    # Read the markdown file
-    with open(from_path, 'r', encoding='utf-8') as f:
-        markdown_content = f.read()
-
-    # Read the template file
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
-
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
-
-    # Extract title
-    title = extract_title(markdown_content)
-
-    # Replace placeholders in template
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
-
-    # Replace href and src attributes with basepath
-    final_html = final_html.replace('href="/', f'href="{basepath}')
-    final_html = final_html.replace('src="/', f'src="{basepath}')
-
-    # Ensure destination directory exists
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
-
-    # Write the final HTML file
-    with open(dest_path, 'w', encoding='utf-8') as f:
-        f.write(final_html)
-
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
-    # Get the original content root for calculating relative paths
-    if not hasattr(generate_pages_recursive, 'content_root'):
-        generate_pages_recursive.content_root = dir_path_content
-
-    # List all items in the content directory
-    items = os.listdir(dir_path_content)
-
-    for item in items:
-        src_item_path = os.path.join(dir_path_content, item)
-
-        if os.path.isfile(src_item_path):
-            if item.endswith('.md'):
-                # Calculate the relative path from the original content root
-                rel_path = os.path.relpath(src_item_path, generate_pages_recursive.content_root)
-                # Change .md to .html
-                html_filename = os.path.splitext(rel_path)[0] + '.html'
-                dest_item_path = os.path.join(dest_dir_path, html_filename)
-
-                # Generate the page
-                generate_page(src_item_path, template_path, dest_item_path, basepath)
-        elif os.path.isdir(src_item_path):
-            # Recursively process subdirectories
-            generate_pages_recursive(src_item_path, template_path, dest_dir_path, basepath)
-
-
-def main():
-    # Get basepath from command line arguments, default to "/"
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-
-    print(f"Using basepath: {basepath}")
-
-    # Get the directory where this script is located
+    # Compiled once and reused until template.html changes; the caller has
+    # already created dest_path's directory
+    template = load_template(template_path).with_basepath(basepath)
+
+    if cache is not None and content_hash is not None:
+        content, metadata = _render_cached(from_path, content_hash, cache, basepath, compact_ast, search)
+        write_page(dest_path, template, metadata.title, lambda sink: sink.write(content))
+        return metadata
+
+    # The title comes before the content in the template but is only known
+    # once its heading block has been parsed. A single pass over the source
+    # renders the content and collects the title together; the content is
+    # spooled (in memory unless the page is large) until the title is known.
+    with open(from_path, 'r', encoding='utf-8') as source, \
+            tempfile.SpooledTemporaryFile(CONTENT_SPOOL_SIZE, mode='w+', encoding='utf-8') as content:
+        metadata = render_page_content(source, content, basepath, compact_ast, search)
+        content.seek(0)
+        write_page(dest_path, template, metadata.title, lambda sink: shutil.copyfileobj(content, sink))
+    return metadata
+
+
+def discover_pages(dir_path_content, dest_dir_path, tree=None):
+    # Collect (source path, path relative to the content root, output path,
+    # stat result) for every markdown file below dir_path_content, sorted by
+    # relative path. tree is the scan_tree() of dir_path_content, if the
+    # caller already has it.
+    if tree is None:
+        tree = scan_tree(dir_path_content)
+
+    pages = []
+    for source in tree.files:
+        if source.rel_path.endswith('.md'):
+            # Change .md to .html
+            html_filename = source.rel_path[:-len('.md')] + '.html'
+            dest_item_path = os.path.join(dest_dir_path, html_filename)
+            pages.append((source.path, source.rel_path, dest_item_path, source.stat))
+
+    return pages
+
+
+def _make_output_dirs(dest_dirs):
+    # Parents sort before their children, so each directory costs a single
+    # mkdir, which fails harmlessly when it is already there
+    for dest_dir in sorted(dest_dirs):
+        try:
+            os.mkdir(dest_dir)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            # Its parent holds no pages of its own
+            os.makedirs(dest_dir)
+
+
+def _generate_page_jobs(jobs):
+    # Top-level wrapper so a chunk of jobs can be pickled for a worker
+    # process
+    return [generate_page(*job) for job in jobs]
+
+
+def balanced_chunks(sizes, chunk_count):
+    # Deal indexes into chunk_count chunks round-robin, largest first, so
+    # the biggest pages are spread across chunks instead of all landing in
+    # the first one. Chunks come out heaviest first.
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True)
+    chunks = [order[k::chunk_count] for k in range(chunk_count)]
+    return [chunk for chunk in chunks if chunk]
+
+
+def _render_pages_parallel(jobs, job_count, sizes):
+    # Several chunks per worker, each a mix of large and small pages, so no
+    # worker is left with all the slow ones. Returns each job's metadata in
+    # the original order.
+    results = [None] * len(jobs)
+
+    with ProcessPoolExecutor(max_workers=job_count) as executor:
+        chunks = balanced_chunks(sizes, job_count * 4)
+        futures = [executor.submit(_generate_page_jobs, [jobs[i] for i in chunk]) for chunk in chunks]
+        # Waiting on every future raises worker exceptions here
+        for chunk, future in zip(chunks, futures):
+            for i, metadata in zip(chunk, future.result()):
+                results[i] = metadata
+    return results
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", manifest=None, template_hash=None, jobs=1, pages=None, compact_ast=False, index=None, search=False, content_cache=None):
+    # Returns {source path relative to the content root: DocumentMetadata}
+    # for the pages rendered in this call. Serial renders of pages smaller
+    # than CONTENT_SPOOL_SIZE go through content_cache when one is given;
+    # larger ones keep streaming through a spool file.
+    if pages is None:
+        pages = discover_pages(dir_path_content, dest_dir_path)
+
+    pending = []
+    rendered = []
+    # A page missing from the content index (or, for search, missing its
+    # terms) is rendered even when fresh, so enabling either fills it in
+    indexed = index.paths(searchable=search) if index is not None else None
+
+    for src_item_path, rel_path, dest_item_path, source_stat in pages:
+        content_hash = None
+        if manifest is not None:
+            # Skip pages whose source, template and basepath are unchanged
+            content_hash, source_stat = manifest.content_hash(rel_path, src_item_path, source_stat)
+            if manifest.is_fresh(rel_path, content_hash, template_hash, basepath, dest_item_path) and (indexed is None or rel_path in indexed):
+                continue
+
+        rendered.append((rel_path, content_hash, source_stat, dest_item_path))
+        pending.append((src_item_path, template_path, dest_item_path, basepath, compact_ast, search))
+
+    # Output directories are created once up front rather than per page
+    _make_output_dirs({os.path.dirname(dest_item_path) for _, _, _, dest_item_path in rendered})
+
+    if jobs > 1 and len(pending) > 1:
+        results = _render_pages_parallel(pending, jobs, [source_stat.st_size for _, _, source_stat, _ in rendered])
+    else:
+        results = [
+            generate_page(*job, cache=content_cache if source_stat.st_size < CONTENT_SPOOL_SIZE else None, content_hash=content_hash)
+            for job, (_, content_hash, source_stat, _) in zip(pending, rendered)
+        ]
+
+    # Only record pages once every render has succeeded
+    if manifest is not None:
+        for rel_path, content_hash, source_stat, dest_item_path in rendered:
+            manifest.record(rel_path, content_hash, source_stat, template_hash, basepath, dest_item_path)
+    if index is not None:
+        index.update(
+            (rel_path, content_hash, dest_item_path, metadata)
+            for (rel_path, content_hash, _, dest_item_path), metadata in zip(rendered, results)
+        )
+
+    return {rel_path: metadata for (rel_path, _, _, _), metadata in zip(rendered, results)}
+
+
+class BuildResult:
+    def __init__(self):
+        # Content path -> DocumentMetadata of the pages rendered
+        self.rendered = {}
+        self.static_copied = 0
+        # Output paths removed because their source is gone
+        self.removed = []
+        # Content path -> broken (kind, url) links, when links are checked
+        self.broken = {}
+
+    def summary(self):
+        broken = sum(len(links) for links in self.broken.values())
+        return (
+            f"{len(self.rendered)} pages rendered, {self.static_copied} static files copied, "
+            f"{len(self.removed)} removed, {broken} broken links"
+        )
+
+    def __repr__(self):
+        return f"BuildResult({self.summary()})"
+
+
+class SiteBuilder:
+    # One site's build configuration plus the state worth keeping between
+    # builds in a long-lived process: the manifest, the content index
+    # connection, the source tree scans, the template hash and rendered page
+    # content. Not safe to share between threads.
+    def __init__(self, project_root, basepath="/", jobs=1, checksum=False, publish="copy", dedupe=False,
+                 compact_ast=False, content_index=False, listings=False, search=False, check_links=False):
+        self.project_root = os.path.abspath(project_root)
+        self.basepath = basepath
+        self.jobs = jobs
+        self.checksum = checksum
+        self.compact_ast = compact_ast
+        self.listings = listings
+        self.search = search
+        self.check_links = check_links
+        self.use_index = content_index or listings or search or check_links
+
+        self.content_path = os.path.join(self.project_root, "content")
+        self.static_path = os.path.join(self.project_root, "static")
+        self.docs_path = os.path.join(self.project_root, "docs")
+        self.template_path = os.path.join(self.project_root, "template.html")
+        self.cache_path = os.path.join(self.project_root, ".cache")
+
+        self.publisher = Publisher(publish, dedupe)
+        self.content_cache = ContentCache()
+        self.manifest = None
+        self.index = None
+        self.content_tree = None
+        self.static_tree = None
+        self._template_hash = (None, None)
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+    def template_hash(self):
+        # Compiling here warms the template cache that forked workers
+        # inherit; the file is only hashed again when its stat changes
+        load_template(self.template_path, os.path.join(self.cache_path, "template.json"))
+        template_stat = os.stat(self.template_path)
+        key = (template_stat.st_mtime_ns, template_stat.st_size)
+        if self._template_hash[0] != key:
+            self._template_hash = (key, hash_file(self.template_path))
+        return self._template_hash[1]
+
+    def pages(self):
+        return discover_pages(self.content_path, self.docs_path, self.content_tree)
+
+    def build(self, full=False):
+        print(f"Using basepath: {self.basepath}")
+        result = BuildResult()
+
+        # Without a usable manifest we cannot tell which outputs are stale,
+        # so start from an empty docs/ directory
+        manifest_path = os.path.join(self.cache_path, "manifest.json")
+        if self.manifest is None:
+            self.manifest = BuildManifest.load(manifest_path)
+        full_build = full or not self.manifest.pages
+        if full_build:
+            self.manifest = BuildManifest(manifest_path)
+        self.manifest.seen = set()
+
+        # One scan of each source tree, shared by every stage below
+        self.content_tree = scan_tree(self.content_path)
+        self.static_tree = scan_tree(self.static_path)
+        pages = self.pages()
+
+        print("Starting static site generation...")
+        if full_build:
+            copy_static_to_public(self.static_path, self.docs_path, self.publisher, self.static_tree)
+            result.static_copied = len(self.static_tree.files)
+        else:
+            # Generated pages and listings are not orphans, even though
+            # static/ lacks them. Pages whose source is gone are kept too,
+            # so that manifest.prune removes and reports them.
+            generated = [dest_item_path for _, _, dest_item_path, _ in pages] + list(self.manifest.listings)
+            generated += [entry["output"] for entry in self.manifest.pages.values()]
+            if self.search:
+                generated += search_outputs(self.docs_path)
+            result.static_copied = sync_static_to_public(
+                self.static_path, self.docs_path, generated, self.checksum, self.publisher, self.static_tree
+            )
+            print(f"{result.static_copied} static files updated")
+        print("Static files copied successfully!")
+
+        template_hash = self.template_hash()
+        result.rendered = self._render(pages, template_hash)
+        result.removed = self.manifest.prune(self.docs_path)
+        for removed_path in result.removed:
+            print(f"Removed stale page: {removed_path}")
+
+        self._finish(result, pages, template_hash, full_build)
+        print("All pages generated successfully!")
+        return result
+
+    def build_paths(self, paths):
+        # Rebuild only what changed paths (absolute, or relative to the
+        # project root) affect: a markdown file re-renders its page, a
+        # static file is copied or removed, and the template re-wraps every
+        # page. Anything else, or no earlier build, falls back to build().
+        if self.manifest is None or self.content_tree is None:
+            return self.build()
+
+        result = BuildResult()
+        changed_pages = set()
+        changed_static = set()
+        template_changed = False
+
+        for path in paths:
+            path = os.path.normpath(os.path.join(self.project_root, path))
+            if path == self.template_path:
+                template_changed = True
+            elif path.startswith(self.content_path + os.sep) and path.endswith(".md"):
+                changed_pages.add(os.path.relpath(path, self.content_path))
+            elif path.startswith(self.content_path + os.sep) and not os.path.isdir(path):
+                # Only markdown files are rendered
+                continue
+            elif path.startswith(self.static_path + os.sep) and not os.path.isdir(path):
+                changed_static.add(os.path.relpath(path, self.static_path))
+            else:
+                return self.build()
+
+        for rel_path in sorted(changed_static):
+            source = self.static_tree.refresh(rel_path)
+            dest_item_path = os.path.join(self.docs_path, rel_path)
+            if source is not None:
+                os.makedirs(os.path.dirname(dest_item_path), exist_ok=True)
+                print(f"Copying file: {source.path} -> {dest_item_path}")
+                self.publisher.publish(source.path, dest_item_path)
+                result.static_copied += 1
+            elif os.path.exists(dest_item_path):
+                print(f"Removing orphaned file: {dest_item_path}")
+                os.remove(dest_item_path)
+
+        for rel_path in sorted(changed_pages):
+            if self.content_tree.refresh(rel_path) is None:
+                removed_path = self.manifest.forget(rel_path, self.docs_path)
+                if removed_path is not None:
+                    print(f"Removed stale page: {removed_path}")
+                    result.removed.append(removed_path)
+
+        pages = self.pages()
+        template_hash = self.template_hash()
+        if template_changed:
+            targets = pages
+        else:
+            targets = [page for page in pages if page[1] in changed_pages]
+        result.rendered = self._render(targets, template_hash)
+
+        self._finish(result, pages, template_hash, False)
+        return result
+
+    def render_one(self, path):
+        # Full HTML of one content page (absolute, or relative to content/),
+        # from the content cache when the source is unchanged. Nothing is
+        # written to docs/.
+        from_path = os.path.join(self.content_path, path)
+        content, metadata = _render_cached(
+            from_path, hash_file(from_path), self.content_cache, self.basepath, self.compact_ast, self.search
+        )
+        template = load_template(self.template_path).with_basepath(self.basepath)
+        sink = io.StringIO()
+        template.write(sink, Title=escape_text(metadata.title), Content=content)
+        return sink.getvalue()
+
+    def _render(self, pages, template_hash):
+        if self.use_index and self.index is None:
+            self.index = ContentIndex(os.path.join(self.cache_path, "content.sqlite3"))
+
+        return generate_pages_recursive(
+            self.content_path, self.template_path, self.docs_path, self.basepath, self.manifest, template_hash,
+            self.jobs, pages, self.compact_ast, self.index, self.search, self.content_cache,
+        )
+
+    def _finish(self, result, pages, template_hash, full_build):
+        if self.index is not None:
+            self.index.prune(rel_path for _, rel_path, _, _ in pages)
+            page_outputs = [dest_item_path for _, _, dest_item_path, _ in pages]
+            if self.listings:
+                generate_listings(self.index, self.template_path, self.docs_path, self.basepath, self.manifest, template_hash, skip=page_outputs)
+            if self.search:
+                written = write_search_index(self.index, self.docs_path, self.basepath, full=full_build)
+                print(f"{len(written)} search index files written")
+            if self.check_links:
+                # Links were collected while rendering and stored in the
+                # index, so checking them never reads the generated HTML
+                outputs = page_outputs + list(self.manifest.listings) + search_outputs(self.docs_path)
+                result.broken = check_links(self.index.all_links(), build_known_paths(self.docs_path, outputs, self.static_tree))
+        if not self.listings:
+            # Listings left by an earlier build with --listings would
+            # otherwise be kept, and go stale, forever
+            for removed_path in self.manifest.prune_listings(set(), self.docs_path):
+                print(f"Removed stale listing: {removed_path}")
+        self.manifest.save()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into docs/")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix for site-absolute links")
+    parser.add_argument("--full", action="store_true", help="ignore the build manifest and rebuild everything")
+    parser.add_argument("--checksum", action="store_true", help="compare static files by content hash rather than mtime")
+    parser.add_argument("--publish", choices=PUBLISH_MODES, default="copy", help="how static files reach docs/: copy, hardlink, or reflink/in-kernel copy")
+    parser.add_argument("--dedupe", action="store_true", help="store identical static files once by hardlinking them together")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="render pages across N worker processes")
+    parser.add_argument("--content-index", action="store_true", help="keep page metadata, tags and links in a SQLite index under .cache/")
+    parser.add_argument("--listings", action="store_true", help="generate paginated blog and tag pages from the content index (implies --content-index)")
+    parser.add_argument("--search", action="store_true", help="write a sharded full-text search index to docs/search/ (implies --content-index)")
+    parser.add_argument("--check-links", action="store_true", help="report internal links and images with no matching page or static file (implies --content-index)")
+    resident = parser.add_mutually_exclusive_group()
+    resident.add_argument("--daemon", action="store_true", help="after building, stay resident and rebuild on requests from src/client.py")
+    resident.add_argument("--watch", action="store_true", help="after building, rebuild whatever changes in content/, static/ or template.html")
+    parser.add_argument("--socket", help="Unix socket for --daemon (default: .cache/daemon.sock)")
+    parser.add_argument("--compact-ast", action="store_true", help="parse pages into a flat array-backed document instead of a node tree")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # The project root is the parent of the directory holding this script
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
-    static_path = os.path.join(project_root, "static")
-    docs_path = os.path.join(project_root, "docs")
-
-    print("Starting static site generation...")
-    copy_static_to_public(static_path, docs_path)
-    print("Static files copied successfully!")
 
-    # Generate all pages recursively
-    content_path = os.path.join(project_root, "content")
-    template_path = os.path.join(project_root, "template.html")
-
-    generate_pages_recursive(content_path, template_path, docs_path, basepath)
-    print("All pages generated successfully!")
+    builder = SiteBuilder(
+        project_root, args.basepath, jobs=args.jobs, checksum=args.checksum, publish=args.publish, dedupe=args.dedupe,
+        compact_ast=args.compact_ast, content_index=args.content_index, listings=args.listings, search=args.search,
+        check_links=args.check_links,
+    )
+    try:
+        result = builder.build(full=args.full)
+        if args.daemon:
+            # Keep the warm builder resident; clients trigger later builds
+            serve(builder, args.socket or default_socket_path(project_root))
+        elif args.watch:
+            watch(builder)
+    finally:
+        builder.close()
+
+    if args.check_links:
+        for line in format_report(result.broken):
+            print(line)
+        print(f"{sum(len(links) for links in result.broken.values())} broken links in {len(result.broken)} pages")
 
     # Example TextNode functionality (keeping for testing)
     node = TextNode("This is some anchor text", TextType.LINK, "https://www.boot.dev")
     print(f"Example TextNode: {node}")
 
+    return 1 if result.broken else 0
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
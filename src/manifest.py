@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+
+MANIFEST_VERSION = 2
+
+
+@contextmanager
+def atomic_write(path):
+    # Text file to write path's new content into. It is written next to
+    # path and only moved over it once complete, so a failed or interrupted
+    # write never leaves a truncated file behind.
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            yield f
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path, pages=None, listings=None):
+        self.path = path
+        # Maps source path (relative to the content root) to the inputs and
+        # output of its last successful render
+        self.pages = pages if pages is not None else {}
+        # Maps generated listing output paths to the signature of their inputs
+        self.listings = listings if listings is not None else {}
+        # Sources discovered during the current build
+        self.seen = set()
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls(path)
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # A damaged manifest just means a full rebuild
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+
+        return cls(path, data.get("pages", {}), data.get("listings", {}))
+
+    def content_hash(self, source, source_path, stat=None):
+        # Reuse the stored hash when size and mtime are unchanged, so an
+        # untouched page costs one stat instead of a full read, or none when
+        # discovery already took it
+        self.seen.add(source)
+        if stat is None:
+            stat = os.stat(source_path)
+        entry = self.pages.get(source)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["hash"], stat
+
+        return hash_file(source_path), stat
+
+    def is_fresh(self, source, content_hash, template_hash, basepath, output_path):
+        entry = self.pages.get(source)
+        if entry is None:
+            return False
+
+        return (
+            entry.get("hash") == content_hash
+            and entry.get("template_hash") == template_hash
+            and entry.get("basepath") == basepath
+            and entry.get("output") == output_path
+            and os.path.exists(output_path)
+        )
+
+    def record(self, source, content_hash, stat, template_hash, basepath, output_path):
+        self.pages[source] = {
+            "hash": content_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "template_hash": template_hash,
+            "basepath": basepath,
+            "output": output_path,
+        }
+
+    def listing_is_fresh(self, output_path, signature):
+        return self.listings.get(output_path) == signature and os.path.exists(output_path)
+
+    def record_listing(self, output_path, signature):
+        self.listings[output_path] = signature
+
+    def prune_listings(self, current_outputs, dest_root):
+        # Remove listing pages that were not generated in this build
+        removed = []
+        for output_path in list(self.listings):
+            if output_path in current_outputs:
+                continue
+
+            del self.listings[output_path]
+            if _remove_output(output_path, dest_root):
+                removed.append(output_path)
+
+        return removed
+
+    def prune(self, dest_root):
+        # Remove outputs whose source was not seen in this build
+        removed = []
+        for source in list(self.pages):
+            if source in self.seen:
+                continue
+
+            output_path = self.pages.pop(source)["output"]
+            if _remove_output(output_path, dest_root):
+                removed.append(output_path)
+
+        return removed
+
+    def forget(self, source, dest_root):
+        # Drop a deleted source and remove its output. Returns the removed
+        # output path, or None.
+        entry = self.pages.pop(source, None)
+        if entry is not None and _remove_output(entry["output"], dest_root):
+            return entry["output"]
+        return None
+
+    def save(self):
+        manifest_dir = os.path.dirname(self.path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+
+        with atomic_write(self.path) as f:
+            json.dump({"version": MANIFEST_VERSION, "pages": self.pages, "listings": self.listings}, f, indent=1, sort_keys=True)
+
+
+def _remove_output(output_path, dest_root):
+    if not os.path.exists(output_path):
+        return False
+    os.remove(output_path)
+    _remove_empty_parents(os.path.dirname(output_path), dest_root)
+    return True
+
+
+def _remove_empty_parents(dir_path, stop_path):
+    stop_path = os.path.abspath(stop_path)
+    dir_path = os.path.abspath(dir_path)
+
+    while dir_path != stop_path and dir_path.startswith(stop_path + os.sep):
+        try:
+            os.rmdir(dir_path)
+        except OSError:
+            # Directory is not empty
+            break
+        dir_path = os.path.dirname(dir_path)
@@ -0,0 +1,120 @@
+import errno
+import fcntl
+import os
+import shutil
+from manifest import hash_file
+
+PUBLISH_MODES = ("copy", "link", "clone")
+
+# ioctl request number for FICLONE (share extents between two files)
+FICLONE = 0x40049409
+
+
+class Publisher:
+    def __init__(self, mode="copy", dedupe=False):
+        if mode not in PUBLISH_MODES:
+            raise ValueError(f"Unknown publish mode: {mode}")
+
+        self.mode = mode
+        self.dedupe = dedupe
+        # Published files grouped by size; content is only hashed once two
+        # files share a size. A long-lived publisher keeps these across
+        # builds, so hashes are remembered together with the stat they were
+        # taken at.
+        self._published_by_size = {}
+        self._hashes = {}
+
+    def publish(self, src_path, dest_path):
+        # Never write through an existing destination: it may be a hardlink
+        # back into static/
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+
+        if self.dedupe:
+            duplicate_path = self._find_duplicate(src_path)
+            if duplicate_path is not None and _try_link(duplicate_path, dest_path):
+                return
+
+        if self.mode == "link":
+            if not _try_link(src_path, dest_path):
+                # Cross-device or unsupported: fall back to a cheap copy
+                clone_file(src_path, dest_path)
+        elif self.mode == "clone":
+            clone_file(src_path, dest_path)
+        else:
+            shutil.copy2(src_path, dest_path)
+
+        if self.dedupe:
+            size = os.path.getsize(dest_path)
+            self._published_by_size.setdefault(size, set()).add(dest_path)
+
+    def _find_duplicate(self, src_path):
+        candidates = self._published_by_size.get(os.path.getsize(src_path))
+        if not candidates:
+            return None
+
+        # Compare against what was actually published, which may since have
+        # been replaced or removed
+        src_hash = self._hash(src_path)
+        for candidate in sorted(candidates):
+            if os.path.exists(candidate) and self._hash(candidate) == src_hash:
+                return candidate
+
+        return None
+
+    def _hash(self, path):
+        file_stat = os.stat(path)
+        key = (file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, hash_file(path))
+            self._hashes[path] = cached
+        return cached[1]
+
+
+def _try_link(src_path, dest_path):
+    try:
+        os.link(src_path, dest_path)
+    except OSError as e:
+        if e.errno in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+            return False
+        raise
+    return True
+
+
+def clone_file(src_path, dest_path):
+    # Cheapest available in-kernel copy: reflink, then copy_file_range, then
+    # shutil.copyfile (which uses sendfile on Linux)
+    with open(src_path, 'rb') as fsrc, open(dest_path, 'wb') as fdst:
+        copied = _reflink(fsrc, fdst) or _copy_file_range(fsrc, fdst)
+
+    if not copied:
+        shutil.copyfile(src_path, dest_path)
+    shutil.copystat(src_path, dest_path)
+
+
+def _reflink(fsrc, fdst):
+    try:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def _copy_file_range(fsrc, fdst):
+    if not hasattr(os, "copy_file_range"):
+        return False
+
+    remaining = os.fstat(fsrc.fileno()).st_size
+    try:
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+    except OSError:
+        # Unsupported for this pair of files; start over with a plain copy
+        fdst.truncate(0)
+        return False
+
+    return remaining == 0
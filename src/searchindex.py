@@ -0,0 +1,91 @@
+import json
+import os
+import re
+
+from listings import page_url
+from manifest import atomic_write
+
+SEARCH_DIR = "search"
+DOCUMENTS_FILE = "documents.json"
+SHARD_NAME_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def shard_name(prefix):
+    # File name (without .json) of the shard holding terms with this
+    # prefix: the prefix itself when it is plain ASCII, otherwise "_" and
+    # its UTF-8 bytes in hex
+    if SHARD_NAME_PATTERN.fullmatch(prefix):
+        return prefix
+    return "_" + prefix.encode("utf-8").hex()
+
+
+def write_search_index(index, dest_dir_path, basepath="/", full=False):
+    # Write the search index for the pages in the content index as
+    # dest/search/documents.json ({"basepath", "documents": {id: [url,
+    # title]}}) plus one <shard>.json per term prefix ({term: [id, count,
+    # id, count, ...]}). Only shards whose postings changed since the last
+    # write are rewritten, unless full is set or the output is missing or
+    # was written for another basepath. Returns the paths written.
+    search_dir = os.path.join(dest_dir_path, SEARCH_DIR)
+    documents_path = os.path.join(search_dir, DOCUMENTS_FILE)
+    os.makedirs(search_dir, exist_ok=True)
+
+    full = full or _written_basepath(documents_path) != basepath
+    prefixes = index.term_prefixes() if full else set(index.changed_prefixes)
+    written = []
+
+    if full or index.documents_changed:
+        documents = {
+            doc_id: [_apply_basepath(page_url(path), basepath), title]
+            for doc_id, (path, title) in index.search_documents().items()
+        }
+        _write_json(documents_path, {"basepath": basepath, "documents": documents})
+        written.append(documents_path)
+
+    if full:
+        # Drop shards for prefixes that no longer have any terms
+        current = {shard_name(prefix) + ".json" for prefix in prefixes}
+        for file_name in os.listdir(search_dir):
+            if file_name != DOCUMENTS_FILE and file_name.endswith(".json") and file_name not in current:
+                os.remove(os.path.join(search_dir, file_name))
+
+    for prefix in sorted(prefixes):
+        shard_path = os.path.join(search_dir, shard_name(prefix) + ".json")
+        postings = index.postings(prefix)
+        if postings:
+            shard = {term: [value for posting in term_postings for value in posting] for term, term_postings in postings.items()}
+            _write_json(shard_path, shard)
+            written.append(shard_path)
+        elif os.path.exists(shard_path):
+            os.remove(shard_path)
+
+    index.changed_prefixes.clear()
+    index.documents_changed = False
+    return written
+
+
+def search_outputs(dest_dir_path):
+    # Files currently making up the search index
+    search_dir = os.path.join(dest_dir_path, SEARCH_DIR)
+    if not os.path.isdir(search_dir):
+        return []
+    return [os.path.join(search_dir, file_name) for file_name in os.listdir(search_dir)]
+
+
+def _written_basepath(documents_path):
+    try:
+        with open(documents_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("basepath")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _apply_basepath(url, basepath):
+    if basepath != "/" and url.startswith("/"):
+        return basepath + url[1:]
+    return url
+
+
+def _write_json(path, data):
+    with atomic_write(path) as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
@@ -0,0 +1,45 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+# Helpers for tests that build a whole project directory
+
+TEMPLATE = "<title>{{ Title }}</title><link href=\"/index.css\"><article>{{ Content }}</article>"
+
+
+def write_file(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    # Make every write visible to mtime checks
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    return path
+
+
+def run_quietly(function, *args):
+    # (result, printed output) of function(*args)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = function(*args)
+    return result, output.getvalue()
+
+
+class SiteTestCase(unittest.TestCase):
+    # A temporary project root holding template.html
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("template.html", TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        return write_file(os.path.join(self.root, rel_path), text)
+
+    def read_output(self, rel_path):
+        with open(os.path.join(self.root, "docs", rel_path), 'r', encoding='utf-8') as f:
+            return f.read()
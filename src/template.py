@@ -0,0 +1,126 @@
+import io
+import json
+import os
+import re
+
+from manifest import atomic_write
+
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+
+# In-process cache: absolute template path -> ((mtime_ns, size), CompiledTemplate)
+_template_cache = {}
+
+
+class CompiledTemplate:
+    def __init__(self, segments, slots):
+        # segments[i] is the static text before slots[i]; the final segment
+        # follows the last slot, so len(segments) == len(slots) + 1
+        self.segments = segments
+        self.slots = slots
+        self._rebased = {}
+
+    @classmethod
+    def compile(cls, text):
+        segments = []
+        slots = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(text):
+            segments.append(text[position:match.start()])
+            slots.append(match.group(1))
+            position = match.end()
+        segments.append(text[position:])
+        return cls(segments, slots)
+
+    def render(self, **values):
+        sink = io.StringIO()
+        self.write(sink, **values)
+        return sink.getvalue()
+
+    def write(self, sink, **values):
+        # Slots are filled in one pass, so a value that itself contains a
+        # placeholder is never substituted again. Unknown slots are kept as
+        # is. A value may be a callable taking the sink, which lets page
+        # content write itself in place.
+        sink.write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot)
+            if value is None:
+                sink.write(f"{{{{ {slot} }}}}")
+            elif callable(value):
+                value(sink)
+            else:
+                sink.write(value)
+            sink.write(segment)
+
+    def with_basepath(self, basepath):
+        # Rewrite site-absolute href/src attributes in the static segments.
+        # Slot values are rendered with the basepath already applied.
+        if basepath == "/":
+            return self
+
+        if basepath not in self._rebased:
+            segments = [
+                segment.replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+                for segment in self.segments
+            ]
+            self._rebased[basepath] = CompiledTemplate(segments, self.slots)
+        return self._rebased[basepath]
+
+    def to_dict(self):
+        return {"segments": self.segments, "slots": self.slots}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["segments"], data["slots"])
+
+    def __eq__(self, other):
+        return self.segments == other.segments and self.slots == other.slots
+
+    def __repr__(self):
+        return f"CompiledTemplate({self.segments}, {self.slots})"
+
+
+def load_template(template_path, cache_path=None):
+    # Compile template_path at most once per change: first from the
+    # in-process cache, then from the on-disk cache at cache_path, both
+    # keyed by mtime and size
+    template_path = os.path.abspath(template_path)
+    stat = os.stat(template_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _template_cache.get(template_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    template = _load_cached_template(cache_path, template_path, key)
+    if template is None:
+        with open(template_path, 'r', encoding='utf-8') as f:
+            template = CompiledTemplate.compile(f.read())
+        if cache_path is not None:
+            _save_cached_template(cache_path, template_path, key, template)
+
+    _template_cache[template_path] = (key, template)
+    return template
+
+
+def _load_cached_template(cache_path, template_path, key):
+    if cache_path is None or not os.path.exists(cache_path):
+        return None
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data["path"] != template_path or tuple(data["key"]) != key:
+            return None
+        return CompiledTemplate.from_dict(data["template"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_cached_template(cache_path, template_path, key, template):
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    with atomic_write(cache_path) as f:
+        json.dump({"path": template_path, "key": list(key), "template": template.to_dict()}, f)
@@ -0,0 +1,86 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from contentindex import ContentIndex
+from textnode import DocumentMetadata
+
+
+def make_metadata(title, front_matter=None, links=(), images=(), word_count=0):
+    metadata = DocumentMetadata()
+    metadata.title = title
+    metadata.front_matter = front_matter or {}
+    metadata.links = list(links)
+    metadata.images = list(images)
+    metadata.word_count = word_count
+    return metadata
+
+
+class TestContentIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "content.sqlite3")
+        self.index = ContentIndex(self.path)
+        self.index.update([
+            ("blog/a/index.md", "h1", "docs/blog/a/index.html", make_metadata(
+                "Post A",
+                {"date": datetime.date(2024, 1, 2), "tags": ["elves", "lore"]},
+                links=["/blog/b", "https://example.com"],
+                images=["/images/a.png"],
+                word_count=12,
+            )),
+            ("blog/b/index.md", "h2", "docs/blog/b/index.html", make_metadata(
+                "Post B",
+                {"date": "2024-03-04", "tags": "elves"},
+                links=["/blog/a"],
+            )),
+            ("blog/draft/index.md", "h3", "docs/blog/draft/index.html", make_metadata(
+                "Draft", {"draft": True, "tags": ["lore"]},
+            )),
+            ("index.md", "h4", "docs/index.html", make_metadata("Home", links=["/blog/a"])),
+        ])
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def test_get(self):
+        page = self.index.get("blog/a/index.md")
+        self.assertEqual(page["title"], "Post A")
+        self.assertEqual(page["hash"], "h1")
+        self.assertEqual(page["date"], "2024-01-02")
+        self.assertEqual(page["word_count"], 12)
+        self.assertEqual(page["tags"], ["elves", "lore"])
+        self.assertIsNone(self.index.get("missing.md"))
+
+    def test_listing_queries(self):
+        self.assertEqual([page["title"] for page in self.index.pages("blog/")], ["Post B", "Post A"])
+        self.assertEqual(len(self.index.pages("blog/", include_drafts=True)), 3)
+        self.assertEqual(self.index.tag_counts(), {"elves": 2, "lore": 2})
+        self.assertEqual([page["path"] for page in self.index.pages_with_tag("elves")], ["blog/b/index.md", "blog/a/index.md"])
+
+    def test_link_graph(self):
+        self.assertEqual(self.index.links_from("blog/a/index.md"), [("link", "/blog/b"), ("link", "https://example.com"), ("image", "/images/a.png")])
+        self.assertEqual(self.index.links_to("/blog/a"), ["blog/b/index.md", "index.md"])
+        self.assertEqual(self.index.all_links()["blog/draft/index.md"], [])
+        self.assertEqual(self.index.all_links()["blog/b/index.md"], [("link", "/blog/a")])
+
+    def test_update_replaces_tags_and_links(self):
+        self.index.update([("blog/a/index.md", "h5", "docs/blog/a/index.html", make_metadata("Post A v2", {"tags": ["new"]}))])
+        self.assertEqual(self.index.get("blog/a/index.md")["tags"], ["new"])
+        self.assertEqual(self.index.links_from("blog/a/index.md"), [])
+        self.assertEqual(self.index.tag_counts(), {"elves": 1, "lore": 1, "new": 1})
+
+    def test_prune_and_reopen(self):
+        removed = self.index.prune({"index.md", "blog/a/index.md"})
+        self.assertEqual(removed, ["blog/b/index.md", "blog/draft/index.md"])
+        self.assertEqual(self.index.links_to("/blog/a"), ["index.md"])
+        self.index.close()
+
+        self.index = ContentIndex(self.path)
+        self.assertEqual(self.index.paths(), {"index.md", "blog/a/index.md"})
+
+
+if __name__ == "__main__":
+    unittest.main()
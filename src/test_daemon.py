@@ -0,0 +1,146 @@
+import contextlib
+import io
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from client import request
+from daemon import _OutputStream, _remove_stale_socket, serve
+from main import SiteBuilder
+from sitefixture import SiteTestCase
+
+
+class TestOutputStream(unittest.TestCase):
+    def test_forwards_complete_lines(self):
+        wfile = io.BytesIO()
+        output = _OutputStream(wfile)
+        output.write("one\ntw")
+        self.assertEqual(wfile.getvalue(), b'{"output": "one"}\n')
+        output.write("o\n")
+        output.write("three")
+        output.flush()
+        self.assertEqual(
+            wfile.getvalue(),
+            b'{"output": "one"}\n{"output": "two"}\n{"output": "three"}\n',
+        )
+
+    def test_drops_output_once_client_is_gone(self):
+        class ClosedFile:
+            def write(self, data):
+                raise BrokenPipeError(32, "Broken pipe")
+
+        output = _OutputStream(ClosedFile())
+        output.write("one\ntwo\n")
+        output.flush()
+        self.assertIsNone(output.wfile)
+
+
+class TestBuildDaemon(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("content/index.md", "# Home\n\n[Post](/blog/a)")
+        self.write("content/blog/a/index.md", "# Post A")
+        self.socket_path = os.path.join(self.root, ".cache", "daemon.sock")
+        self.builder = SiteBuilder(self.root, check_links=True)
+        self.thread = threading.Thread(target=self._serve)
+        self.thread.start()
+        # Wait for the socket to accept connections
+        for _ in range(500):
+            if os.path.exists(self.socket_path):
+                break
+            self.thread.join(0.01)
+
+    def tearDown(self):
+        if self.thread.is_alive():
+            self._request({"command": "stop"})
+        self.thread.join()
+        super().tearDown()
+        # Request handling never ends in a traceback
+        self.assertEqual(self.errors.getvalue(), "")
+
+    def _serve(self):
+        # The builder's SQLite connection belongs to the serving thread
+        self.errors = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(self.errors):
+                serve(self.builder, self.socket_path)
+        finally:
+            self.builder.close()
+
+    def _request(self, message):
+        out = io.StringIO()
+        response = request(self.socket_path, message, out)
+        return response, out.getvalue()
+
+    def test_ping(self):
+        self.assertEqual(self._request({"command": "ping"})[0], {"exit": 0, "summary": "pong"})
+
+    def test_build_streams_output_and_summary(self):
+        response, output = self._request({"command": "build"})
+        self.assertEqual(response["exit"], 0)
+        self.assertIn("2 pages rendered", response["summary"])
+        self.assertIn("index.md", output)
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs", "blog", "a", "index.html")))
+
+        response, _ = self._request({"command": "build"})
+        self.assertIn("0 pages rendered", response["summary"])
+
+    def test_paths_rebuilds_one_page(self):
+        self._request({"command": "build"})
+        self.write("content/blog/a/index.md", "# Post A, edited")
+        response, _ = self._request({"command": "paths", "paths": [os.path.join(self.root, "content/blog/a/index.md")]})
+        self.assertIn("1 pages rendered", response["summary"])
+        self.assertIn("Post A, edited", self.read_output("blog/a/index.html"))
+
+    def test_broken_links_exit_non_zero(self):
+        self.write("content/index.md", "# Home\n\n[Gone](/missing)")
+        response, output = self._request({"command": "build"})
+        self.assertEqual(response["exit"], 1)
+        self.assertIn("broken link: /missing", output)
+
+    def test_render(self):
+        response, _ = self._request({"command": "render", "path": "blog/a/index.md"})
+        self.assertEqual(response["html"], '<title>Post A</title><link href="/index.css"><article><div><h1>Post A</h1></div></article>')
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs")))
+
+    def test_errors_keep_daemon_running(self):
+        response, _ = self._request({"command": "render", "path": "missing.md"})
+        self.assertEqual(response["exit"], 1)
+        self.assertIn("FileNotFoundError", response["error"])
+        response, _ = self._request({"command": "frobnicate"})
+        self.assertEqual(response["error"], "ValueError: Unknown command: frobnicate")
+        self.assertEqual(self._request({"command": "ping"})[0]["summary"], "pong")
+
+    def test_stop_removes_socket(self):
+        self._request({"command": "stop"})
+        self.thread.join()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_build_finishes_after_client_disconnects(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+            sock.sendall(b'{"command": "build"}\n')
+        self.assertEqual(self._request({"command": "ping"})[0]["summary"], "pong")
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs", "blog", "a", "index.html")))
+        self.assertIn("0 pages rendered", self._request({"command": "build"})[0]["summary"])
+
+    def test_refuses_second_daemon(self):
+        with self.assertRaises(RuntimeError):
+            _remove_stale_socket(self.socket_path)
+
+
+class TestStaleSocket(unittest.TestCase):
+    def test_removes_socket_nobody_listens_on(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            socket_path = os.path.join(tmp, "daemon.sock")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(socket_path)
+            sock.close()
+            _remove_stale_socket(socket_path)
+            self.assertFalse(os.path.exists(socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
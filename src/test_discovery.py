@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from discovery import SourceTree, scan_tree
+
+
+class TestScanTree(unittest.TestCase):
+    def test_scan_tree(self):
+        with tempfile.TemporaryDirectory() as root:
+            for rel_path in ("b.md", "a/z.png", "a/b/c.md", "a-b/x.css"):
+                path = os.path.join(root, rel_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    f.write(rel_path)
+
+            tree = scan_tree(root)
+
+        self.assertEqual(tree.directories, ["a", "a-b", "a/b"])
+        self.assertEqual([source.rel_path for source in tree.files], ["a-b/x.css", "a/b/c.md", "a/z.png", "b.md"])
+        for source in tree.files:
+            self.assertEqual(source.path, os.path.join(root, source.rel_path))
+            self.assertEqual(source.stat.st_size, len(source.rel_path))
+
+    def test_missing_root_is_empty(self):
+        tree = scan_tree(os.path.join(tempfile.gettempdir(), "does-not-exist-static"))
+        self.assertIsInstance(tree, SourceTree)
+        self.assertEqual((tree.directories, tree.files), ([], []))
+
+    def test_skips_dangling_symlinks(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "index.md"), 'w') as f:
+                f.write("# Home")
+            os.symlink("user@host.1234:1700000000", os.path.join(root, ".#index.md"))
+
+            tree = scan_tree(root)
+
+        self.assertEqual([source.rel_path for source in tree.files], ["index.md"])
+
+
+class TestSourceTreeRefresh(unittest.TestCase):
+    def test_adds_replaces_and_drops_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            for rel_path in ("a.md", "c.md"):
+                with open(os.path.join(root, rel_path), 'w') as f:
+                    f.write("x")
+            tree = scan_tree(root)
+
+            os.makedirs(os.path.join(root, "b", "d"))
+            with open(os.path.join(root, "b", "d", "e.md"), 'w') as f:
+                f.write("new")
+            self.assertEqual(tree.refresh(os.path.join("b", "d", "e.md")).stat.st_size, 3)
+
+            with open(os.path.join(root, "a.md"), 'w') as f:
+                f.write("longer")
+            self.assertEqual(tree.refresh("a.md").stat.st_size, 6)
+
+            os.remove(os.path.join(root, "c.md"))
+            self.assertIsNone(tree.refresh("c.md"))
+            self.assertIsNone(tree.refresh("missing.md"))
+
+            self.assertEqual(tree.directories, ["b", "b/d"])
+            self.assertEqual([source.rel_path for source in tree.files], ["a.md", "b/d/e.md"])
+            self.assertEqual(tree.files, scan_tree(root).files)
+
+
+if __name__ == "__main__":
+    unittest.main()
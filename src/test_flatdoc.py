@@ -0,0 +1,86 @@
+import io
+import unittest
+
+from flatdoc import FlatDocument, ELEMENT, LINK, TEXT, markdown_to_flat_document
+from textnode import DocumentMetadata, markdown_to_html_node, write_markdown_html
+
+
+class TestFlatDocument(unittest.TestCase):
+    def assertSameHtml(self, md, basepath="/"):
+        expected = markdown_to_html_node(md).to_html(basepath)
+        self.assertEqual(markdown_to_flat_document(md).to_html(basepath), expected)
+
+    def test_empty_document(self):
+        document = markdown_to_flat_document("")
+        self.assertEqual(len(document), 1)
+        self.assertEqual(document.to_html(), "<div></div>")
+
+    def test_paragraph_layout(self):
+        document = markdown_to_flat_document("Hello [world](/w)")
+        self.assertEqual(list(document.kind), [ELEMENT, ELEMENT, TEXT, LINK])
+        self.assertEqual(list(document.end), [4, 4, 3, 4])
+        self.assertEqual(document.text[document.text_start[3]:document.text_end[3]], "world")
+        self.assertEqual(document.text[document.url_start[3]:document.url_end[3]], "/w")
+
+    def test_all_block_types_match_tree(self):
+        md = """# Heading with **bold**
+
+Paragraph with *italic*, `code`, a [link](/blog) and ![img](/images/a.png)
+across lines, where 1 < 2 & "quotes" stay.
+
+> quoted
+> **text**
+
+- one
+- _two_
+
+1. first
+2. second
+
+```
+code block
+
+with blank line
+```
+
+###### Small heading"""
+        self.assertSameHtml(md)
+        self.assertSameHtml(md, "/site/")
+
+    def test_nested_lists_close_in_order(self):
+        self.assertSameHtml("- a\n- b\n\nafter\n\n1. x\n2. y")
+
+    def test_write_html_streams_to_sink(self):
+        document = markdown_to_flat_document("# Title\n\nText")
+        sink = io.StringIO()
+        document.write_html(sink)
+        self.assertEqual(sink.getvalue(), "<div><h1>Title</h1><p>Text</p></div>")
+
+    def test_metadata_matches_tree(self):
+        md = "---\n# Title [x](/x)\n\n> ![q](/q.png)\n\n1. [y](/y)"
+        metadata = DocumentMetadata()
+        markdown_to_flat_document(md, metadata)
+        self.assertEqual(metadata, markdown_to_html_node(md, with_metadata=True)[1])
+        self.assertEqual(metadata.links, ["/x", "/y"])
+
+    def test_search_terms_match_tree(self):
+        md = "# Title **bold**\n\nSee [a link](/x) and ![alt](/i.png)\n\n- one `code`"
+        metadata = DocumentMetadata(collect_terms=True)
+        markdown_to_flat_document(md, metadata)
+        expected = DocumentMetadata(collect_terms=True)
+        write_markdown_html(md, io.StringIO(), metadata=expected)
+        self.assertEqual(metadata.terms, expected.terms)
+        self.assertNotIn("alt", metadata.terms)
+
+    def test_manual_construction(self):
+        document = FlatDocument()
+        root = document.open_element("ul")
+        item = document.open_element("li")
+        document.add_leaf("b", "bold")
+        document.close_element(item)
+        document.close_element(root)
+        self.assertEqual(document.finish().to_html(), "<ul><li><b>bold</b></li></ul>")
+
+
+if __name__ == "__main__":
+    unittest.main()
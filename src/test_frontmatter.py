@@ -0,0 +1,73 @@
+import datetime
+import io
+import os
+import tempfile
+import unittest
+
+from frontmatter import parse_yaml_lite, read_front_matter
+
+
+def split(markdown):
+    # (front matter, body), reading the body from where the header ends
+    source = io.StringIO(markdown)
+    front_matter = read_front_matter(source)
+    return front_matter, source.read()
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_yaml_lite(self):
+        front_matter, body = split("""---
+title: "Tolkien: a life"
+date: 2024-05-01
+draft: false
+weight: 3
+tags: [elves, lore]
+authors:
+  - Tolkien
+  - 'Lewis'
+# comment
+---
+# Body""")
+        self.assertEqual(front_matter, {
+            "title": "Tolkien: a life",
+            "date": datetime.date(2024, 5, 1),
+            "draft": False,
+            "weight": 3,
+            "tags": ["elves", "lore"],
+            "authors": ["Tolkien", "Lewis"],
+        })
+        self.assertEqual(body, "# Body")
+
+    def test_toml(self):
+        front_matter, body = split('+++\ntitle = "Post"\ndate = 2024-05-01\ntags = ["a"]\n+++\n\n# Body\n')
+        self.assertEqual(front_matter, {"title": "Post", "date": datetime.date(2024, 5, 1), "tags": ["a"]})
+        self.assertEqual(body, "\n# Body\n")
+
+    def test_no_front_matter_leaves_source_untouched(self):
+        source = io.StringIO("# Title\n\nText")
+        self.assertEqual(read_front_matter(source), {})
+        self.assertEqual(source.read(), "# Title\n\nText")
+        self.assertEqual(split(""), ({}, ""))
+
+    def test_unclosed_front_matter(self):
+        with self.assertRaises(ValueError):
+            read_front_matter("---\ntitle: x\n# Title")
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            parse_yaml_lite("just text")
+        with self.assertRaises(ValueError):
+            parse_yaml_lite("title: x\n- item")
+
+    def test_file_read_stops_at_header(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "post.md")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("---\ntags: [a]\n---\n```\n" + "x" * 100_000)
+            with open(path, 'r', encoding='utf-8') as f:
+                self.assertEqual(read_front_matter(f), {"tags": ["a"]})
+                self.assertEqual(f.readline(), "```\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
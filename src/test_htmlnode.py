@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_attribute, escape_text
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -22,6 +23,29 @@ class TestHTMLNode(unittest.TestCase):
         expected = ' src="image.jpg"'
         self.assertEqual(node.props_to_html(), expected)
 
+    def test_props_to_html_with_basepath(self):
+        node = HTMLNode("a", "Home", None, {"href": "/blog/tom", "title": "/not-a-url"})
+        self.assertEqual(node.props_to_html("/site/"), ' href="/site/blog/tom" title="/not-a-url"')
+
+    def test_props_to_html_basepath_leaves_external_urls(self):
+        node = HTMLNode("img", None, None, {"src": "https://example.com/a.png"})
+        self.assertEqual(node.props_to_html("/site/"), ' src="https://example.com/a.png"')
+
+    def test_props_to_html_escapes_values(self):
+        node = HTMLNode("img", None, None, {"src": "a.png?x=1&y=2", "alt": 'say "hi" <now>'})
+        expected = ' src="a.png?x=1&amp;y=2" alt="say &quot;hi&quot; &lt;now&gt;"'
+        self.assertEqual(node.props_to_html(), expected)
+
+    def test_props_to_html_reuses_cached_string(self):
+        first = HTMLNode("a", None, None, {"href": "/blog"}).props_to_html("/site/")
+        second = HTMLNode("a", None, None, {"href": "/blog"}).props_to_html("/site/")
+        self.assertEqual(first, ' href="/site/blog"')
+        self.assertIs(first, second)
+
+    def test_props_to_html_unhashable_value(self):
+        node = HTMLNode("div", None, None, {"class": ["a", "b"]})
+        self.assertEqual(node.props_to_html(), ' class="[\'a\', \'b\']"')
+
     def test_to_html_not_implemented(self):
         node = HTMLNode("p", "Hello world")
         with self.assertRaises(NotImplementedError):
@@ -39,6 +63,19 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(repr(node), expected)
 
 
+    def test_empty_props_stored_as_none(self):
+        node = HTMLNode("p", "Hello", None, {})
+        self.assertIsNone(node.props)
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode(), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_tag_is_interned(self):
+        tag = "".join(["h", "2"])
+        self.assertIs(HTMLNode(tag).tag, HTMLNode("h2").tag)
+
+
 class TestLeafNode(unittest.TestCase):
     def test_leaf_to_html_p(self):
         node = LeafNode("p", "Hello, world!")
@@ -65,6 +102,13 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("img", "", {"src": "image.jpg", "alt": "An image"})
         self.assertEqual(node.to_html(), '<img src="image.jpg" alt="An image"></img>')
 
+    def test_leaf_to_html_escapes_value(self):
+        node = LeafNode("code", 'if a < b && c > d: print("x")')
+        self.assertEqual(node.to_html(), '<code>if a &lt; b &amp;&amp; c &gt; d: print("x")</code>')
+
+    def test_leaf_to_html_no_tag_escapes_value(self):
+        self.assertEqual(LeafNode(None, "< Back").to_html(), "&lt; Back")
+
     def test_leaf_repr(self):
         node = LeafNode("p", "Hello", {"class": "text"})
         expected = "LeafNode(p, Hello, {'class': 'text'})"
@@ -148,6 +192,62 @@ class TestParentNode(unittest.TestCase):
         expected = "<div><span><em><strong>very nested</strong></em></span></div>"
         self.assertEqual(level1.to_html(), expected)
 
+    def test_to_html_applies_basepath_to_descendants(self):
+        node = ParentNode("p", [
+            LeafNode("a", "link", {"href": "/contact"}),
+            LeafNode(None, 'text mentioning href="/contact"'),
+            LeafNode("img", "", {"src": "/images/a.png", "alt": "a"}),
+        ])
+        expected = '<p><a href="/site/contact">link</a>text mentioning href="/contact"<img src="/site/images/a.png" alt="a"></img></p>'
+        self.assertEqual(node.to_html("/site/"), expected)
+
+    def test_to_html_leaf_and_mixed_children(self):
+        # Leaf-only elements render in one piece, mixed ones through the
+        # stack; both escape and apply props the same way
+        node = ParentNode("div", [
+            LeafNode(None, "a & b"),
+            ParentNode("p", [LeafNode(None, "x < y"), LeafNode("a", "go", {"href": "/x"})]),
+            LeafNode("i", "<end>"),
+        ])
+        expected = '<div>a &amp; b<p>x &lt; y<a href="/site/x">go</a></p><i>&lt;end&gt;</i></div>'
+        self.assertEqual(node.to_html("/site/"), expected)
+
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", [LeafNode("b", None)])]).to_html()
+
+    def test_write_html_matches_to_html(self):
+        node = ParentNode("div", [
+            LeafNode("h1", "Title"),
+            ParentNode("ul", [LeafNode("li", "Item")], {"class": "list"}),
+            LeafNode("a", "link", {"href": "/x"}),
+        ])
+        sink = io.StringIO()
+        node.write_html(sink, "/site/")
+        self.assertEqual(sink.getvalue(), node.to_html("/site/"))
+
+    def test_write_html_leaf(self):
+        sink = io.StringIO()
+        LeafNode("b", "bold").write_html(sink)
+        self.assertEqual(sink.getvalue(), "<b>bold</b>")
+
+    def test_write_html_no_tag_raises_error(self):
+        with self.assertRaises(ValueError):
+            ParentNode(None, []).write_html(io.StringIO())
+
+    def test_to_html_beyond_recursion_limit(self):
+        node = LeafNode("b", "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(html.count("</span>"), 5000)
+        self.assertIn("<b>deep</b>", html)
+
+    def test_to_html_leaf_without_value_in_tree_raises_error(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode("b", None)])])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
     def test_repr_with_children(self):
         child = LeafNode("span", "child")
         parent = ParentNode("div", [child], {"class": "container"})
@@ -161,5 +261,38 @@ class TestParentNode(unittest.TestCase):
         self.assertEqual(repr(parent), expected)
 
 
+    def test_repr_nested_parents(self):
+        inner = ParentNode("span", [LeafNode("b", "x"), LeafNode(None, "y")])
+        outer = ParentNode("div", [inner, LeafNode("i", "z")])
+        expected = "ParentNode(div, children: [ParentNode(span, children: [LeafNode(b, x, None), LeafNode(None, y, None)], None), LeafNode(i, z, None)], None)"
+        self.assertEqual(repr(outer), expected)
+
+    def test_repr_beyond_recursion_limit(self):
+        node = LeafNode("b", "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        text = repr(node)
+        self.assertTrue(text.startswith("ParentNode(span, children: [ParentNode(span"))
+        self.assertTrue(text.endswith("None)], None)"))
+
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_text_fast_path_returns_same_object(self):
+        text = "nothing to escape here"
+        self.assertIs(escape_text(text), text)
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a & b < c > "d"'), 'a &amp; b &lt; c &gt; "d"')
+
+    def test_escape_attribute(self):
+        self.assertEqual(escape_attribute('a & "b"'), "a &amp; &quot;b&quot;")
+        value = "/images/a.png"
+        self.assertIs(escape_attribute(value), value)
+
+    def test_escaped_tree_output(self):
+        node = ParentNode("p", [LeafNode(None, "1 < 2 "), LeafNode("a", "Q&A", {"href": "/q?a=1&b=2"})])
+        self.assertEqual(node.to_html(), '<p>1 &lt; 2 <a href="/q?a=1&amp;b=2">Q&amp;A</a></p>')
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from discovery import scan_tree
+from linkcheck import build_known_paths, check_links, format_report, page_base, resolve_link, site_paths
+
+
+class TestLinkCheck(unittest.TestCase):
+    def test_site_paths(self):
+        self.assertEqual(site_paths("index.html"), ["/index.html", "/"])
+        self.assertEqual(site_paths("blog/tom/index.html"), ["/blog/tom/index.html", "/blog/tom", "/blog/tom/"])
+        self.assertEqual(site_paths("notes.html"), ["/notes.html", "/notes"])
+        self.assertEqual(site_paths("images/a.png"), ["/images/a.png"])
+
+    def test_resolve_link(self):
+        self.assertEqual(resolve_link("/blog/tom", "/"), "/blog/tom")
+        self.assertEqual(resolve_link("/blog/tom/#top", "/"), "/blog/tom/")
+        self.assertEqual(resolve_link("../images/a%20b.png?v=2", "/blog/tom/"), "/blog/images/a b.png")
+        self.assertEqual(resolve_link("img.png", page_base("blog/tom/index.md")), "/blog/tom/img.png")
+        self.assertEqual(page_base("index.md"), "/")
+        for url in ("https://example.com/x", "//cdn.example.com/x", "mailto:a@b.c", "#section"):
+            self.assertIsNone(resolve_link(url, "/"))
+
+    def test_check_links(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, "docs")
+            static = os.path.join(tmp, "static")
+            os.makedirs(os.path.join(static, "images"))
+            open(os.path.join(static, "images", "a.png"), 'w').close()
+            open(os.path.join(static, "index.css"), 'w').close()
+
+            outputs = [os.path.join(dest, "index.html"), os.path.join(dest, "blog", "tom", "index.html")]
+            known = build_known_paths(dest, outputs, scan_tree(static))
+
+        self.assertIn("/images/a.png", known)
+        self.assertIn("/index.css", known)
+        broken = check_links({
+            "index.md": [("link", "/blog/tom"), ("image", "/images/a.png"), ("link", "https://example.com")],
+            "blog/tom/index.md": [("link", "/"), ("link", "/blog/missing"), ("image", "../../images/b.png")],
+        }, known)
+        self.assertEqual(broken, {"blog/tom/index.md": [("link", "/blog/missing"), ("image", "../../images/b.png")]})
+        self.assertEqual(format_report(broken), [
+            "blog/tom/index.md:",
+            "  broken link: /blog/missing",
+            "  broken image: ../../images/b.png",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from contentindex import ContentIndex
+from listings import ListingPage, generate_listings, page_url, paginate, plan_listings, tag_slug
+from manifest import BuildManifest
+from textnode import DocumentMetadata
+
+
+def add_post(index, path, title, date=None, tags=(), draft=False):
+    metadata = DocumentMetadata()
+    metadata.title = title
+    metadata.summary = f"About {title}"
+    metadata.front_matter = {"tags": list(tags), "draft": draft}
+    if date:
+        metadata.front_matter["date"] = date
+    index.update([(path, "hash", "out", metadata)])
+
+
+class TestListingHelpers(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.md"), "/")
+        self.assertEqual(page_url("blog/tom/index.md"), "/blog/tom")
+        self.assertEqual(page_url("blog/notes.md"), "/blog/notes.html")
+
+    def test_tag_slug(self):
+        self.assertEqual(tag_slug("Middle Earth!"), "middle-earth")
+        self.assertEqual(tag_slug("???"), "tag")
+
+    def test_paginate(self):
+        pages = paginate("blog", "Blog", list(range(5)), per_page=2)
+        self.assertEqual(pages, [
+            ListingPage("blog/index.html", "Blog", [0, 1], None, "/blog/page/2"),
+            ListingPage("blog/page/2/index.html", "Blog (page 2)", [2, 3], "/blog", "/blog/page/3"),
+            ListingPage("blog/page/3/index.html", "Blog (page 3)", [4], "/blog/page/2", None),
+        ])
+        self.assertEqual(paginate("blog", "Blog", []), [ListingPage("blog/index.html", "Blog", [])])
+
+    def test_to_html_node(self):
+        listing = ListingPage("blog/index.html", "Blog", [("/blog/a", "A <1>", "Sum", "2024-01-01")], None, "/blog/page/2")
+        self.assertEqual(
+            listing.to_html_node().to_html("/site/"),
+            '<div><h1>Blog</h1><ul><li><a href="/site/blog/a">A &lt;1&gt;</a><time datetime="2024-01-01">2024-01-01</time>'
+            '<p>Sum</p></li></ul><nav><a href="/site/blog/page/2" rel="next">Older</a></nav></div>',
+        )
+
+
+class TestGenerateListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, 'w', encoding='utf-8') as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+        self.index = ContentIndex(os.path.join(self.root, "content.sqlite3"))
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        add_post(self.index, "blog/a/index.md", "A", "2024-01-01", ["lore"])
+        add_post(self.index, "blog/b/index.md", "B", "2024-02-01", ["lore", "Elves"])
+        add_post(self.index, "blog/c/index.md", "C", "2024-03-01")
+        add_post(self.index, "blog/d/index.md", "D", "2024-04-01", ["lore"], draft=True)
+        add_post(self.index, "index.md", "Home", tags=["lore"])
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def _generate(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            written = generate_listings(self.index, self.template, self.dest, "/", self.manifest, "t", per_page=2)
+        return sorted(os.path.relpath(path, self.dest) for path in written)
+
+    def test_plan_listings(self):
+        listings = {listing.path: listing for listing in plan_listings(self.index, per_page=2)}
+        self.assertEqual(sorted(listings), [
+            "blog/index.html", "blog/page/2/index.html",
+            "tags/elves/index.html", "tags/index.html", "tags/lore/index.html", "tags/lore/page/2/index.html",
+        ])
+        self.assertEqual([entry[1] for entry in listings["blog/index.html"].entries], ["C", "B"])
+        self.assertEqual([entry[1] for entry in listings["tags/lore/index.html"].entries], ["B", "A"])
+        self.assertEqual(listings["tags/index.html"].entries, [("/tags/elves", "Elves", "1 page", None), ("/tags/lore", "lore", "3 pages", None)])
+
+    def test_only_affected_listings_are_regenerated(self):
+        self.assertEqual(len(self._generate()), 6)
+        self.assertEqual(self._generate(), [])
+
+        # Retitling C only touches the first blog page
+        add_post(self.index, "blog/c/index.md", "C2", "2024-03-01")
+        self.assertEqual(self._generate(), ["blog/index.html"])
+        with open(os.path.join(self.dest, "blog", "index.html"), 'r', encoding='utf-8') as f:
+            self.assertIn(">C2</a>", f.read())
+
+    def test_stale_listings_are_removed(self):
+        self._generate()
+        self.index.remove(["blog/b/index.md"])
+        self.assertEqual(self._generate(), ["blog/index.html", "tags/index.html", "tags/lore/index.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "tags", "elves")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "tags", "lore", "page")))
+
+    def test_content_pages_are_not_overwritten(self):
+        skip = [os.path.join(self.dest, "blog", "index.html")]
+        with contextlib.redirect_stdout(io.StringIO()):
+            written = generate_listings(self.index, self.template, self.dest, skip=skip)
+        self.assertNotIn(skip[0], written)
+        self.assertFalse(os.path.exists(skip[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
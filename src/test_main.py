@@ -0,0 +1,360 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from contentindex import ContentIndex
+from main import CONTENT_SPOOL_SIZE, ContentCache, SiteBuilder, balanced_chunks, discover_pages, generate_page, generate_pages_recursive, copy_static_to_public, sync_static_to_public
+from manifest import BuildManifest
+from publish import Publisher
+from sitefixture import TEMPLATE, SiteTestCase, run_quietly, write_file
+from textnode import DocumentMetadata
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, 'w', encoding='utf-8') as f:
+            f.write(TEMPLATE)
+
+        self._write("index.md", "# Home\n\nWelcome [in](/blog/a).")
+        self._write("blog/a/index.md", "# Post A\n\n- one\n- two")
+        self._write("blog/b/index.md", "# Post B\n\n![pic](/images/b.png)")
+        self._write("blog/notes.txt", "not markdown")
+        os.mkdir(os.path.join(self.root, "docs"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel_path, text):
+        path = os.path.join(self.content, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def _read_tree(self, dest):
+        tree = {}
+        for dir_path, _, file_names in os.walk(dest):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                with open(path, 'r', encoding='utf-8') as f:
+                    tree[os.path.relpath(path, dest)] = f.read()
+        return tree
+
+    def test_discover_pages(self):
+        dest = os.path.join(self.root, "docs")
+        pages = discover_pages(self.content, dest)
+        rel_paths = [rel_path for _, rel_path, _, _ in pages]
+        self.assertEqual(rel_paths, ["blog/a/index.md", "blog/b/index.md", "index.md"])
+        for src_path, rel_path, dest_path, stat in pages:
+            self.assertEqual(src_path, os.path.join(self.content, rel_path))
+            self.assertEqual(dest_path, os.path.join(dest, rel_path[:-3] + ".html"))
+            self.assertEqual(stat.st_size, os.path.getsize(src_path))
+
+    def test_parallel_output_matches_serial(self):
+        serial_dest = os.path.join(self.root, "serial")
+        parallel_dest = os.path.join(self.root, "parallel")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, serial_dest, "/site/")
+            generate_pages_recursive(self.content, self.template, parallel_dest, "/site/", jobs=2)
+
+        serial_tree = self._read_tree(serial_dest)
+        self.assertEqual(len(serial_tree), 3)
+        self.assertEqual(serial_tree, self._read_tree(parallel_dest))
+
+    def test_content_index_is_filled_and_refreshed(self):
+        dest = os.path.join(self.root, "docs")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        index = ContentIndex(os.path.join(self.root, "content.sqlite3"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            rendered = generate_pages_recursive(self.content, self.template, dest, "/", manifest, "t", index=index)
+            self.assertEqual(len(rendered), 3)
+            self.assertEqual(index.links_to("/blog/a"), ["index.md"])
+
+            # Fresh pages already in the index are skipped
+            self.assertEqual(generate_pages_recursive(self.content, self.template, dest, "/", manifest, "t", index=index), {})
+            index.remove(["blog/b/index.md"])
+            rendered = generate_pages_recursive(self.content, self.template, dest, "/", manifest, "t", index=index)
+        self.assertEqual(list(rendered), ["blog/b/index.md"])
+        self.assertEqual(index.get("blog/b/index.md")["title"], "Post B")
+        index.close()
+
+    def test_parallel_workers_return_search_terms(self):
+        dest = os.path.join(self.root, "docs")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        index = ContentIndex(os.path.join(self.root, "content.sqlite3"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, dest, "/", manifest, "t", jobs=1, index=index)
+            self.assertEqual(index.paths(searchable=True), set())
+
+            # Enabling search re-renders pages that have no terms yet
+            rendered = generate_pages_recursive(self.content, self.template, dest, "/", manifest, "t", jobs=2, index=index, search=True)
+        self.assertEqual(rendered["blog/a/index.md"].terms, {"post": 1, "one": 1, "two": 1})
+        self.assertEqual(index.postings("po"), {"post": [(index_id, 1) for index_id, (path, _) in index.search_documents().items() if path.startswith("blog/")]})
+        index.close()
+
+    def test_generate_page_returns_metadata(self):
+        dest = os.path.join(self.root, "docs", "a.html")
+        for compact_ast in (False, True):
+            with contextlib.redirect_stdout(io.StringIO()):
+                metadata = generate_page(os.path.join(self.content, "blog/a/index.md"), self.template, dest, compact_ast=compact_ast)
+            self.assertEqual(metadata.title, "Post A")
+            self.assertEqual(metadata.word_count, 4)
+            with open(dest, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), "<title>Post A</title><link href=\"/index.css\"><article><div><h1>Post A</h1><ul><li>one</li><li>two</li></ul></div></article>")
+
+    def test_generate_page_skips_front_matter(self):
+        self._write("fm.md", "---\ntitle: From front matter\ntags: [a, b]\n---\n# Heading\n\nBody")
+        dest = os.path.join(self.root, "docs", "fm.html")
+        with contextlib.redirect_stdout(io.StringIO()):
+            metadata = generate_page(os.path.join(self.content, "fm.md"), self.template, dest)
+        self.assertEqual(metadata.title, "From front matter")
+        self.assertEqual(metadata.front_matter["tags"], ["a", "b"])
+        with open(dest, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "<title>From front matter</title><link href=\"/index.css\"><article><div><h1>Heading</h1><p>Body</p></div></article>")
+
+    def test_generate_page_without_h1_writes_nothing(self):
+        self._write("bad.md", "## No title")
+        dest = os.path.join(self.root, "docs", "bad.html")
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(Exception) as context:
+                generate_page(os.path.join(self.content, "bad.md"), self.template, dest)
+        self.assertEqual(str(context.exception), "No h1 header found")
+        self.assertFalse(os.path.exists(dest))
+
+
+class TestBalancedChunks(unittest.TestCase):
+    def test_spreads_largest_pages(self):
+        sizes = [1, 50, 2, 40, 3, 30, 4, 20]
+        chunks = balanced_chunks(sizes, 4)
+        self.assertEqual(chunks, [[1, 6], [3, 4], [5, 2], [7, 0]])
+        self.assertEqual(sorted(i for chunk in chunks for i in chunk), list(range(len(sizes))))
+
+    def test_fewer_pages_than_chunks(self):
+        self.assertEqual(balanced_chunks([5, 9], 8), [[1], [0]])
+
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self._write(self.static, "index.css", "body {}")
+        self._write(self.static, "images/a.png", "aaaa")
+        with contextlib.redirect_stdout(io.StringIO()):
+            copy_static_to_public(self.static, self.dest)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, root, rel_path, text):
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def _sync(self, keep=(), checksum=False):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sync_static_to_public(self.static, self.dest, keep, checksum)
+
+    def test_noop_sync_copies_nothing(self):
+        self.assertEqual(self._sync(), 0)
+
+    def test_sync_copies_new_and_changed_files(self):
+        self._write(self.static, "index.css", "body { margin: 0 }")
+        self._write(self.static, "images/b.png", "bbbb")
+        self.assertEqual(self._sync(), 2)
+        with open(os.path.join(self.dest, "index.css"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "images", "b.png")))
+
+    def test_checksum_ignores_touched_identical_files(self):
+        css_path = os.path.join(self.static, "index.css")
+        stat = os.stat(css_path)
+        os.utime(css_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(self._sync(checksum=True), 0)
+        self.assertEqual(self._sync(), 1)
+
+    def test_sync_keeps_dedupe_links(self):
+        shutil.rmtree(self.dest)
+        copy_path = self._write(self.static, "images/copy.png", "aaaa")
+        stat = os.stat(copy_path)
+        os.utime(copy_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        first = os.path.join(self.dest, "images", "a.png")
+        second = os.path.join(self.dest, "images", "copy.png")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            sync_static_to_public(self.static, self.dest, publisher=Publisher(dedupe=True))
+            self.assertTrue(os.path.samefile(first, second))
+            # The link carries a.png's mtime but is still up to date
+            self.assertEqual(sync_static_to_public(self.static, self.dest, publisher=Publisher(dedupe=True)), 0)
+        self.assertTrue(os.path.samefile(first, second))
+
+        # Editing one of them still republishes it on its own
+        self._write(self.static, "images/copy.png", "bbbb")
+        self.assertEqual(self._sync(), 1)
+        self.assertFalse(os.path.samefile(first, second))
+
+    def test_sync_removes_orphans_but_keeps_pages(self):
+        page = self._write(self.dest, "blog/index.html", "<p>page</p>")
+        self._write(self.dest, "junk/old.txt", "old")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self._sync(keep=[page])
+
+        self.assertTrue(os.path.exists(page))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "junk")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "a.png")))
+
+
+
+class TestContentCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = ContentCache(max_size=10)
+        cache.put("a", "aaaa", DocumentMetadata())
+        cache.put("b", "bbbb", DocumentMetadata())
+        cache.get("a")
+        cache.put("c", "cccc", DocumentMetadata())
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a")[0], "aaaa")
+        self.assertEqual((len(cache), cache.size), (2, 8))
+
+        cache.put("huge", "x" * 11, DocumentMetadata())
+        self.assertIsNone(cache.get("huge"))
+
+
+class TestSiteBuilder(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("content/index.md", "# Home\n\n[Post](/blog/a)")
+        self.write("content/blog/a/index.md", "# Post A\n\n![pic](/images/a.png)")
+        self.write("static/images/a.png", "png")
+        self.builder = SiteBuilder(self.root, check_links=True)
+
+    def tearDown(self):
+        self.builder.close()
+        super().tearDown()
+
+    def test_build_is_incremental_across_calls(self):
+        result, _ = run_quietly(self.builder.build)
+        self.assertEqual(sorted(result.rendered), ["blog/a/index.md", "index.md"])
+        self.assertEqual(result.static_copied, 1)
+        self.assertEqual(result.broken, {})
+        self.assertEqual(run_quietly(self.builder.build)[0].rendered, {})
+
+    def test_build_reports_removed_pages(self):
+        run_quietly(self.builder.build)
+        os.remove(os.path.join(self.root, "content", "blog", "a", "index.md"))
+        result, output = run_quietly(self.builder.build)
+        stale = os.path.join(self.root, "docs", "blog", "a", "index.html")
+        self.assertEqual(result.removed, [stale])
+        self.assertIn(f"Removed stale page: {stale}", output)
+        self.assertNotIn("Removing orphaned file", output)
+        self.assertFalse(os.path.exists(os.path.dirname(stale)))
+
+    def test_listings_are_removed_once_disabled(self):
+        self.write("content/blog/a/index.md", "---\ndate: 2024-01-01\n---\n# Post A")
+        listing = os.path.join(self.root, "docs", "blog", "index.html")
+        builder = SiteBuilder(self.root, listings=True)
+        run_quietly(builder.build)
+        builder.close()
+        self.assertTrue(os.path.exists(listing))
+
+        _, output = run_quietly(self.builder.build)
+        self.assertIn(f"Removed stale listing: {listing}", output)
+        self.assertFalse(os.path.exists(listing))
+        self.assertEqual(self.builder.manifest.listings, {})
+
+    def test_dangling_symlink_keeps_pages(self):
+        run_quietly(self.builder.build)
+        os.symlink("user@host.1234", os.path.join(self.root, "content", ".#index.md"))
+        os.symlink("user@host.1234", os.path.join(self.root, "static", ".#a.png"))
+        result, _ = run_quietly(self.builder.build)
+        self.assertEqual((result.rendered, result.removed), ({}, []))
+        self.assertIn("<h1>Home</h1>", self.read_output("index.html"))
+        self.assertEqual(self.read_output("images/a.png"), "png")
+
+    def test_build_paths(self):
+        run_quietly(self.builder.build)
+
+        self.write("content/blog/a/index.md", "# Post A2\n\n[gone](/nowhere)")
+        result, _ = run_quietly(self.builder.build_paths, ["content/blog/a/index.md"])
+        self.assertEqual(list(result.rendered), ["blog/a/index.md"])
+        self.assertIn("<h1>Post A2</h1>", self.read_output("blog/a/index.html"))
+        self.assertEqual(result.broken, {"blog/a/index.md": [("link", "/nowhere")]})
+
+        self.write("static/images/b.png", "png")
+        result, _ = run_quietly(self.builder.build_paths, [os.path.join(self.root, "static", "images", "b.png")])
+        self.assertEqual((result.static_copied, result.rendered), (1, {}))
+        self.assertEqual(self.read_output("images/b.png"), "png")
+
+        # A template edit re-wraps every page from cached content
+        self.write("template.html", "<main>{{ Content }}</main>")
+        cached = len(self.builder.content_cache)
+        result, _ = run_quietly(self.builder.build_paths, ["template.html"])
+        self.assertEqual(sorted(result.rendered), ["blog/a/index.md", "index.md"])
+        self.assertEqual(len(self.builder.content_cache), cached)
+        self.assertEqual(self.read_output("index.html"), '<main><div><h1>Home</h1><p><a href="/blog/a">Post</a></p></div></main>')
+
+        os.remove(os.path.join(self.root, "content", "blog", "a", "index.md"))
+        result, _ = run_quietly(self.builder.build_paths, ["content/blog/a/index.md"])
+        self.assertEqual(result.removed, [os.path.join(self.root, "docs", "blog", "a", "index.html")])
+        self.assertEqual(result.broken, {"index.md": [("link", "/blog/a")]})
+
+    def test_dedupe_follows_edits(self):
+        self.write("static/images/copy.png", "png")
+        builder = SiteBuilder(self.root, dedupe=True)
+        run_quietly(builder.build)
+        copy_path = os.path.join(self.root, "docs", "images", "copy.png")
+        self.assertTrue(os.path.samefile(os.path.join(self.root, "docs", "images", "a.png"), copy_path))
+
+        self.write("static/images/copy.png", "gif")
+        run_quietly(builder.build_paths, ["static/images/copy.png"])
+        self.assertEqual(self.read_output("images/copy.png"), "gif")
+
+        self.write("static/images/copy.png", "bmp")
+        run_quietly(builder.build)
+        self.assertEqual(self.read_output("images/copy.png"), "bmp")
+        self.assertEqual(self.read_output("images/a.png"), "png")
+        builder.close()
+
+    def test_option_changes_bypass_cached_content(self):
+        run_quietly(self.builder.build)
+        self.builder.basepath = "/site/"
+        run_quietly(self.builder.build)
+        self.assertIn('<a href="/site/blog/a">', self.read_output("index.html"))
+
+        self.builder.search = True
+        result, _ = run_quietly(self.builder.build)
+        self.assertEqual(result.rendered["index.md"].terms, {"home": 1, "post": 1})
+        self.assertEqual(run_quietly(self.builder.build)[0].rendered, {})
+
+    def test_large_pages_are_streamed_not_cached(self):
+        body = "word " * (CONTENT_SPOOL_SIZE // 5)
+        self.write("content/big.md", "# Big\n\n" + body)
+        run_quietly(self.builder.build)
+        self.assertEqual(len(self.builder.content_cache), 2)
+        self.assertIn(body.strip(), self.read_output("big.html"))
+
+    def test_render_one_matches_build(self):
+        run_quietly(self.builder.build)
+        self.assertEqual(self.builder.render_one("blog/a/index.md"), self.read_output("blog/a/index.html"))
+
+    def test_builders_keep_their_own_roots(self):
+        with tempfile.TemporaryDirectory() as other_root:
+            write_file(os.path.join(other_root, "template.html"), TEMPLATE)
+            write_file(os.path.join(other_root, "content", "other.md"), "# Other")
+
+            other = SiteBuilder(other_root)
+            self.assertEqual(list(run_quietly(self.builder.build)[0].rendered), ["blog/a/index.md", "index.md"])
+            self.assertEqual(list(run_quietly(other.build)[0].rendered), ["other.md"])
+            other.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
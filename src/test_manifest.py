@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest, atomic_write, hash_file
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.source_path = os.path.join(self.root, "index.md")
+        self.output_path = os.path.join(self.root, "docs", "index.html")
+        self.manifest_path = os.path.join(self.root, ".cache", "manifest.json")
+        with open(self.source_path, 'w', encoding='utf-8') as f:
+            f.write("# Hello")
+        os.makedirs(os.path.dirname(self.output_path))
+        with open(self.output_path, 'w', encoding='utf-8') as f:
+            f.write("<h1>Hello</h1>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _record(self, manifest, template_hash="t1", basepath="/"):
+        content_hash, stat = manifest.content_hash("index.md", self.source_path)
+        manifest.record("index.md", content_hash, stat, template_hash, basepath, self.output_path)
+        return content_hash
+
+    def test_load_missing_manifest_is_empty(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.pages, {})
+
+    def test_load_corrupt_manifest_is_empty(self):
+        os.makedirs(os.path.dirname(self.manifest_path))
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            f.write("{not json")
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.pages, {})
+
+    def test_save_and_load_round_trip(self):
+        manifest = BuildManifest(self.manifest_path)
+        content_hash = self._record(manifest)
+        manifest.save()
+
+        loaded = BuildManifest.load(self.manifest_path)
+        self.assertTrue(loaded.is_fresh("index.md", content_hash, "t1", "/", self.output_path))
+
+    def test_changed_inputs_are_not_fresh(self):
+        manifest = BuildManifest(self.manifest_path)
+        content_hash = self._record(manifest)
+        self.assertFalse(manifest.is_fresh("index.md", content_hash, "t2", "/", self.output_path))
+        self.assertFalse(manifest.is_fresh("index.md", content_hash, "t1", "/blog/", self.output_path))
+        self.assertFalse(manifest.is_fresh("index.md", "other", "t1", "/", self.output_path))
+        self.assertFalse(manifest.is_fresh("other.md", content_hash, "t1", "/", self.output_path))
+
+    def test_missing_output_is_not_fresh(self):
+        manifest = BuildManifest(self.manifest_path)
+        content_hash = self._record(manifest)
+        os.remove(self.output_path)
+        self.assertFalse(manifest.is_fresh("index.md", content_hash, "t1", "/", self.output_path))
+
+    def test_content_hash_detects_edit(self):
+        manifest = BuildManifest(self.manifest_path)
+        old_hash = self._record(manifest)
+        with open(self.source_path, 'w', encoding='utf-8') as f:
+            f.write("# Hello again")
+        new_hash, _ = manifest.content_hash("index.md", self.source_path)
+        self.assertNotEqual(old_hash, new_hash)
+        self.assertEqual(new_hash, hash_file(self.source_path))
+
+    def test_prune_removes_outputs_of_deleted_sources(self):
+        manifest = BuildManifest(self.manifest_path)
+        self._record(manifest)
+
+        next_build = BuildManifest(self.manifest_path, dict(manifest.pages))
+        removed = next_build.prune(os.path.join(self.root, "docs"))
+        self.assertEqual(removed, [self.output_path])
+        self.assertFalse(os.path.exists(self.output_path))
+        self.assertEqual(next_build.pages, {})
+
+    def test_prune_keeps_seen_sources(self):
+        manifest = BuildManifest(self.manifest_path)
+        self._record(manifest)
+        self.assertEqual(manifest.prune(os.path.join(self.root, "docs")), [])
+        self.assertTrue(os.path.exists(self.output_path))
+
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def test_replaces_only_when_complete(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.html")
+            with atomic_write(path) as f:
+                f.write("old")
+
+            with self.assertRaises(RuntimeError):
+                with atomic_write(path) as f:
+                    f.write("half")
+                    raise RuntimeError("render failed")
+
+            with open(path, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), "old")
+            self.assertEqual(os.listdir(tmp), ["page.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+from publish import Publisher, clone_file
+
+
+class TestPublisher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, data):
+        path = os.path.join(self.root, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_unknown_mode_raises_error(self):
+        with self.assertRaises(ValueError):
+            Publisher("teleport")
+
+    def test_copy_mode_makes_independent_copy(self):
+        src = self._write("a.png", b"image bytes")
+        dest = os.path.join(self.root, "out.png")
+        Publisher("copy").publish(src, dest)
+        self.assertEqual(self._read(dest), b"image bytes")
+        self.assertFalse(os.path.samefile(src, dest))
+
+    def test_link_mode_hardlinks_source(self):
+        src = self._write("a.png", b"image bytes")
+        dest = os.path.join(self.root, "out.png")
+        Publisher("link").publish(src, dest)
+        self.assertTrue(os.path.samefile(src, dest))
+
+    def test_clone_mode_copies_content_and_mtime(self):
+        src = self._write("a.png", b"x" * 100000)
+        os.utime(src, ns=(1_000_000_000, 1_000_000_000))
+        dest = os.path.join(self.root, "out.png")
+        Publisher("clone").publish(src, dest)
+        self.assertEqual(self._read(dest), b"x" * 100000)
+        self.assertEqual(os.stat(dest).st_mtime_ns, 1_000_000_000)
+        self.assertFalse(os.path.samefile(src, dest))
+
+    def test_publish_does_not_write_through_existing_link(self):
+        src = self._write("a.png", b"original")
+        dest = os.path.join(self.root, "out.png")
+        Publisher("link").publish(src, dest)
+
+        other = self._write("b.png", b"replacement")
+        Publisher("copy").publish(other, dest)
+        self.assertEqual(self._read(src), b"original")
+        self.assertEqual(self._read(dest), b"replacement")
+
+    def test_dedupe_links_identical_files(self):
+        first = self._write("a.png", b"same")
+        second = self._write("b.png", b"same")
+        different = self._write("c.png", b"diff")
+        publisher = Publisher("copy", dedupe=True)
+        outputs = [os.path.join(self.root, f"out{i}.png") for i in range(3)]
+        for src, dest in zip([first, second, different], outputs):
+            publisher.publish(src, dest)
+
+        self.assertTrue(os.path.samefile(outputs[0], outputs[1]))
+        self.assertFalse(os.path.samefile(outputs[0], outputs[2]))
+        self.assertEqual(self._read(outputs[2]), b"diff")
+
+    def test_dedupe_notices_edited_sources(self):
+        first = self._write("a.png", b"same")
+        second = self._write("b.png", b"same")
+        publisher = Publisher("copy", dedupe=True)
+        outputs = [os.path.join(self.root, f"out{i}.png") for i in range(2)]
+        for src, dest in zip([first, second], outputs):
+            publisher.publish(src, dest)
+
+        # The same publisher, as a long-lived builder keeps it
+        self._write("b.png", b"edit")
+        os.utime(second, ns=(0, os.stat(second).st_mtime_ns + 10**9))
+        publisher.publish(second, outputs[1])
+        self.assertEqual(self._read(outputs[1]), b"edit")
+        self.assertEqual(self._read(outputs[0]), b"same")
+
+        self._write("b.png", b"same")
+        publisher.publish(second, outputs[1])
+        self.assertTrue(os.path.samefile(outputs[0], outputs[1]))
+
+    def test_clone_file_empty_file(self):
+        src = self._write("empty.png", b"")
+        dest = os.path.join(self.root, "out.png")
+        clone_file(src, dest)
+        self.assertEqual(self._read(dest), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from contentindex import ContentIndex
+from searchindex import search_outputs, shard_name, write_search_index
+from textnode import DocumentMetadata, write_markdown_html
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.index = ContentIndex(os.path.join(self.tmp.name, "content.sqlite3"))
+        self._update("blog/a/index.md", "# Elves\n\nThe **elves** of [Rivendell](/r) and `code`")
+        self._update("index.md", "# Home\n\nThe hobbits ![ignored alt](/i.png)")
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def _update(self, path, markdown):
+        metadata = DocumentMetadata(collect_terms=True)
+        write_markdown_html(markdown, io.StringIO(), metadata=metadata)
+        self.index.update([(path, "hash", "out", metadata)])
+
+    def _read(self, file_name):
+        with open(os.path.join(self.dest, "search", file_name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _written(self, **kwargs):
+        written = write_search_index(self.index, self.dest, **kwargs)
+        return sorted(os.path.basename(path) for path in written)
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("el"), "el")
+        self.assertEqual(shard_name("zé"), "_7ac3a9")
+
+    def test_full_write(self):
+        self._written(basepath="/site/")
+        self.assertEqual(self._read("documents.json"), {
+            "basepath": "/site/",
+            "documents": {"0": ["/site/blog/a", "Elves"], "1": ["/site/", "Home"]},
+        })
+        self.assertEqual(self._read("el.json"), {"elves": [0, 2]})
+        self.assertEqual(self._read("th.json"), {"the": [0, 1, 1, 1]})
+        self.assertEqual(self._read("co.json"), {"code": [0, 1]})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "ig.json")))
+
+    def test_incremental_write_touches_changed_shards_only(self):
+        self._written()
+        self._update("index.md", "# Home\n\nThe shire")
+        self.assertEqual(self._written(), ["documents.json", "ho.json", "sh.json", "th.json"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "hob.json")))
+        self.assertEqual(self._read("ho.json"), {"home": [1, 1]})
+
+        self.assertEqual(self._written(), [])
+
+    def test_removed_page_drops_postings(self):
+        self._written()
+        self.index.remove(["blog/a/index.md"])
+        self._written()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "el.json")))
+        self.assertEqual(self._read("th.json"), {"the": [1, 1]})
+        self.assertEqual(self._read("documents.json")["documents"], {"1": ["/", "Home"]})
+
+    def test_basepath_change_rewrites_everything(self):
+        self._written()
+        self.assertEqual(len(self._written(basepath="/site/")), len(search_outputs(self.dest)))
+
+
+if __name__ == "__main__":
+    unittest.main()
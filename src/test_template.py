@@ -0,0 +1,90 @@
+import io
+import os
+import tempfile
+import unittest
+
+from template import CompiledTemplate, load_template
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    def test_compile_segments_and_slots(self):
+        template = CompiledTemplate.compile("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.segments, ["<title>", "</title><body>", "</body>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_compile_no_slots(self):
+        template = CompiledTemplate.compile("<p>static</p>")
+        self.assertEqual(template.segments, ["<p>static</p>"])
+        self.assertEqual(template.render(Title="x"), "<p>static</p>")
+
+    def test_render(self):
+        template = CompiledTemplate.compile("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        html = template.render(Title="Hello", Content="<p>Hi</p>")
+        self.assertEqual(html, "<title>Hello</title><body><p>Hi</p></body>")
+
+    def test_render_does_not_substitute_inside_values(self):
+        template = CompiledTemplate.compile("<title>{{ Title }}</title>{{ Content }}")
+        html = template.render(Title="Hello", Content="<code>{{ Title }}</code>")
+        self.assertEqual(html, "<title>Hello</title><code>{{ Title }}</code>")
+
+    def test_render_keeps_unknown_slots(self):
+        template = CompiledTemplate.compile("{{ Title }} {{ Footer }}")
+        self.assertEqual(template.render(Title="Hello"), "Hello {{ Footer }}")
+
+    def test_repeated_slot(self):
+        template = CompiledTemplate.compile("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render(Title="A"), "A|A")
+
+    def test_with_basepath_rewrites_static_segments_only(self):
+        template = CompiledTemplate.compile('<link href="/index.css">{{ Content }}<img src="/logo.png">')
+        rebased = template.with_basepath("/site/")
+        html = rebased.render(Content='<code>href="/x"</code>')
+        self.assertEqual(html, '<link href="/site/index.css"><code>href="/x"</code><img src="/site/logo.png">')
+        self.assertIs(template.with_basepath("/site/"), rebased)
+        self.assertIs(template.with_basepath("/"), template)
+
+    def test_write_streams_callable_values(self):
+        template = CompiledTemplate.compile("<title>{{ Title }}</title>{{ Content }}{{ Footer }}")
+        sink = io.StringIO()
+        template.write(sink, Title="Hello", Content=lambda out: out.write("<p>streamed</p>"))
+        self.assertEqual(sink.getvalue(), "<title>Hello</title><p>streamed</p>{{ Footer }}")
+
+    def test_dict_round_trip(self):
+        template = CompiledTemplate.compile("a{{ Title }}b")
+        self.assertEqual(CompiledTemplate.from_dict(template.to_dict()), template)
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template_path = os.path.join(self.tmp.name, "template.html")
+        self.cache_path = os.path.join(self.tmp.name, ".cache", "template.json")
+        self._write("<h1>{{ Title }}</h1>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, text, mtime_ns=None):
+        with open(self.template_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(self.template_path, ns=(mtime_ns, mtime_ns))
+
+    def test_load_is_cached_in_process(self):
+        first = load_template(self.template_path)
+        self.assertIs(load_template(self.template_path), first)
+
+    def test_load_recompiles_after_change(self):
+        self._write("<h1>{{ Title }}</h1>", mtime_ns=1_000_000_000)
+        load_template(self.template_path)
+        self._write("<h2>{{ Title }}</h2>", mtime_ns=2_000_000_000)
+        self.assertEqual(load_template(self.template_path).render(Title="A"), "<h2>A</h2>")
+
+    def test_load_writes_disk_cache(self):
+        template = load_template(self.template_path, self.cache_path)
+        self.assertTrue(os.path.exists(self.cache_path))
+        self.assertEqual(template.render(Title="A"), "<h1>A</h1>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from textnode import TextNode, TextType, BlockType, text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, block_to_block_type, markdown_to_html_node, extract_title
+from textnode import TextNode, TextType, BlockType, text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, block_to_block_type, markdown_to_html_node, extract_title, iter_markdown_blocks, write_markdown_html, classify_block, DocumentMetadata
 from htmlnode import LeafNode
 
 
@@ -41,6 +42,11 @@ class TestTextNode(unittest.TestCase):
         self.assertNotEqual(node, node2)
 
 
+    def test_has_no_instance_dict(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
+
 class TestTextNodeToHtmlNode(unittest.TestCase):
     def test_text(self):
         node = TextNode("This is a text node", TextType.TEXT)
@@ -585,6 +591,23 @@ class TestSplitNodesLink(unittest.TestCase):
         ]
         self.assertListEqual(expected, new_nodes)
 
+    def test_split_links_same_markdown_inside_image(self):
+        node = TextNode("![a](b) then [a](b)", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        expected = [
+            TextNode("![a](b) then ", TextType.TEXT),
+            TextNode("a", TextType.LINK, "b"),
+        ]
+        self.assertListEqual(expected, new_nodes)
+
+    def test_split_many_links(self):
+        text = "".join(f"see [page {i}](/p/{i}) " for i in range(500))
+        new_nodes = split_nodes_link([TextNode(text, TextType.TEXT)])
+        self.assertEqual(len(new_nodes), 1001)
+        self.assertEqual(new_nodes[0], TextNode("see ", TextType.TEXT))
+        self.assertEqual(new_nodes[-2], TextNode("page 499", TextType.LINK, "/p/499"))
+        self.assertEqual(new_nodes[-1], TextNode(" ", TextType.TEXT))
+
 
 class TestTextToTextnodes(unittest.TestCase):
     def test_text_to_textnodes_full_example(self):
@@ -707,6 +730,58 @@ class TestTextToTextnodes(unittest.TestCase):
         ]
         self.assertListEqual(expected, nodes)
 
+    def test_text_to_textnodes_underscore_in_link_url(self):
+        text = "See [the page](https://example.com/some_page) now"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("See ", TextType.TEXT),
+            TextNode("the page", TextType.LINK, "https://example.com/some_page"),
+            TextNode(" now", TextType.TEXT),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_delimiters_inside_code(self):
+        text = "Use `a * b_c` here"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("Use ", TextType.TEXT),
+            TextNode("a * b_c", TextType.CODE),
+            TextNode(" here", TextType.TEXT),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_underscore_italic(self):
+        text = "an _underscored_ word"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("an ", TextType.TEXT),
+            TextNode("underscored", TextType.ITALIC),
+            TextNode(" word", TextType.TEXT),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_unmatched_delimiter_raises_error(self):
+        with self.assertRaises(ValueError) as context:
+            text_to_textnodes("This is **not closed")
+        self.assertIn("unmatched delimiter '**'", str(context.exception))
+
+    def test_text_to_textnodes_matches_six_pass_pipeline(self):
+        samples = [
+            "**a** *b* _c_ `d` ![e](f.png) [g](/h)",
+            "multi\nline **bold\ntext** end",
+            "![img](a.png)[link](b)**x**",
+            "****",
+            "text ![broken](image and [ok](url)",
+        ]
+        for text in samples:
+            nodes = [TextNode(text, TextType.TEXT)]
+            nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+            nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+            nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+            nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+            nodes = split_nodes_link(split_nodes_image(nodes))
+            self.assertListEqual(nodes, text_to_textnodes(text))
+
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -813,6 +888,23 @@ multiple lines"""
         self.assertEqual(blocks, ["Block 1", "Block 2", "Block 3"])
 
 
+    def test_markdown_to_blocks_fenced_code_with_blank_lines(self):
+        md = "Intro\n\n```\nfirst\n\nsecond\n```\n\nOutro"
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks, ["Intro", "```\nfirst\n\nsecond\n```", "Outro"])
+
+    def test_markdown_to_blocks_inline_triple_backticks_do_not_open_fence(self):
+        md = "Text with ```inline``` span\n\nNext block"
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks, ["Text with ```inline``` span", "Next block"])
+
+    def test_iter_markdown_blocks_from_lines(self):
+        lines = io.StringIO("# Title\n\nLine 1\nLine 2\n\n\n- item\n")
+        blocks = iter_markdown_blocks(lines)
+        self.assertEqual(next(blocks), "# Title")
+        self.assertEqual(list(blocks), ["Line 1\nLine 2", "- item"])
+
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_block_to_block_type_heading_h1(self):
         block = "# This is a heading"
@@ -957,6 +1049,24 @@ def hello():
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
 
+    def test_block_to_block_type_ordered_list_multi_digit(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 13))
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+
+    def test_block_to_block_type_ordered_list_leading_zero(self):
+        block = "01. First\n02. Second"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_classify_block_returns_lines_for_line_based_types(self):
+        self.assertEqual(classify_block("- a\n- b"), (BlockType.UNORDERED_LIST, ["- a", "- b"]))
+        self.assertEqual(classify_block("> a\n> b"), (BlockType.QUOTE, ["> a", "> b"]))
+        self.assertEqual(classify_block("1. a\n2. b"), (BlockType.ORDERED_LIST, ["1. a", "2. b"]))
+
+    def test_classify_block_paragraph_has_no_lines(self):
+        self.assertEqual(classify_block("Plain\ntext"), (BlockType.PARAGRAPH, None))
+        self.assertEqual(classify_block("- a\nb"), (BlockType.PARAGRAPH, None))
+
+
 class TestMarkdownToHtmlNode(unittest.TestCase):
     def test_paragraphs(self):
         md = """
@@ -1167,6 +1277,18 @@ that should be joined."""
         )
 
 
+    def test_codeblock_with_blank_lines(self):
+        md = "```\ndef a():\n    pass\n\n\ndef b():\n    pass\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><pre><code>def a():\n    pass\n\n\ndef b():\n    pass\n</code></pre></div>")
+
+    def test_write_markdown_html_matches_to_html(self):
+        md = "# Title\n\nSome **bold** and a [link](/x).\n\n> quote\n\n1. one\n2. two"
+        sink = io.StringIO()
+        write_markdown_html(io.StringIO(md), sink, "/site/")
+        self.assertEqual(sink.getvalue(), markdown_to_html_node(md).to_html("/site/"))
+
+
 class TestExtractTitle(unittest.TestCase):
     def test_extract_title_basic(self):
         markdown = "# Hello"
@@ -1250,5 +1372,76 @@ Content without h1."""
         self.assertEqual(str(context.exception), "No h1 header found")
 
 
+    def test_extract_title_from_lines(self):
+        lines = io.StringIO("Intro\n\n# From a file\n\nBody\n")
+        self.assertEqual(extract_title(lines), "From a file")
+
+
+class TestDocumentMetadata(unittest.TestCase):
+    def test_metadata_from_single_pass(self):
+        md = """## Intro
+
+# Main *Title*
+
+Two words
+
+> quoted line
+
+- a b
+- c
+
+1. one
+2. two three
+
+```
+x = 1
+```
+
+# Second"""
+        node, metadata = markdown_to_html_node(md, with_metadata=True)
+        self.assertEqual(node.to_html(), markdown_to_html_node(md).to_html())
+        self.assertEqual(metadata.title, "Main *Title*")
+        self.assertEqual(metadata.headings, [(2, "Intro"), (1, "Main *Title*"), (1, "Second")])
+        self.assertEqual(metadata.word_count, 1 + 2 + 2 + 2 + 3 + 3 + 3 + 1)
+
+    def test_metadata_without_h1(self):
+        _, metadata = markdown_to_html_node("## Only h2\n\ntext", with_metadata=True)
+        self.assertIsNone(metadata.title)
+        self.assertEqual(metadata.headings, [(2, "Only h2")])
+
+    def test_metadata_title_is_first_heading_line(self):
+        md = "# Title\nsecond line\n\nBody"
+        _, metadata = markdown_to_html_node(md, with_metadata=True)
+        self.assertEqual(metadata.title, extract_title(md))
+        self.assertEqual(metadata.title, "Title")
+
+    def test_metadata_summary_skips_link_only_paragraphs(self):
+        md = "[< Back](/)\n\n# Title\n\nFirst **real** [para](/p) ![img](/i.png)\n\nSecond"
+        _, metadata = markdown_to_html_node(md, with_metadata=True)
+        self.assertEqual(metadata.summary, "First real para ")
+
+        _, metadata = markdown_to_html_node("word " * 100, with_metadata=True)
+        self.assertTrue(metadata.summary.endswith("word…"))
+        self.assertLessEqual(len(metadata.summary), 201)
+
+    def test_metadata_collects_search_terms(self):
+        metadata = DocumentMetadata(collect_terms=True)
+        write_markdown_html("# The Elves\n\n**Elves** of [Rivendell](/rivendell) ![alt text](/i.png)\n\n```\nx = elves\n```", io.StringIO(), metadata=metadata)
+        self.assertEqual(dict(metadata.terms), {"the": 1, "elves": 3, "of": 1, "rivendell": 1})
+        self.assertIsNone(DocumentMetadata().terms)
+
+    def test_metadata_collects_urls(self):
+        md = "See [a](/a) and ![img](/i.png)\n\n- [b](/b)\n\n```\n[not](/code)\n```"
+        _, metadata = markdown_to_html_node(md, with_metadata=True)
+        self.assertEqual(metadata.links, ["/a", "/b"])
+        self.assertEqual(metadata.images, ["/i.png"])
+
+    def test_write_markdown_html_fills_metadata(self):
+        metadata = DocumentMetadata()
+        write_markdown_html(io.StringIO("#   Spaced   \n\nBody text"), io.StringIO(), metadata=metadata)
+        self.assertEqual(metadata.title, "Spaced")
+        self.assertEqual(metadata.word_count, 3)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
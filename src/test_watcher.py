@@ -0,0 +1,155 @@
+import os
+import shutil
+import unittest
+
+from main import SiteBuilder
+from sitefixture import SiteTestCase, run_quietly
+from watcher import InotifyWatcher, PollingWatcher, wait_for_changes, watch
+
+
+class FakeWatcher:
+    # Hands out prepared batches of changes (None for a quiet poll), then
+    # interrupts like Ctrl-C
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.closed = False
+
+    def poll(self, timeout=None):
+        if self.batches:
+            return set(self.batches.pop(0) or ())
+        if timeout is None:
+            raise KeyboardInterrupt
+        return set()
+
+    def close(self):
+        self.closed = True
+
+
+class WatcherTests:
+    # Shared by both watcher implementations
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.write("content/index.md", "# Home")
+        self.watcher = self.create_watcher([self.content], [self.template])
+
+    def tearDown(self):
+        self.watcher.close()
+        super().tearDown()
+
+    def _changes(self):
+        return wait_for_changes(self.watcher, debounce=self.debounce, timeout=2)
+
+    def test_reports_edited_file(self):
+        self.write("content/index.md", "# Home, edited")
+        self.assertEqual(self._changes(), {os.path.join(self.content, "index.md")})
+
+    def test_reports_new_file_in_new_directory(self):
+        self.write("content/blog/a/index.md", "# A")
+        self.assertIn(os.path.join(self.content, "blog", "a", "index.md"), self._changes())
+
+    def test_reports_deleted_file(self):
+        os.remove(os.path.join(self.content, "index.md"))
+        self.assertEqual(self._changes(), {os.path.join(self.content, "index.md")})
+
+    def test_reports_file_replaced_by_rename(self):
+        self.write("template.html.tmp", "<p>{{ Content }}</p>")
+        os.replace(self.template + ".tmp", self.template)
+        self.assertEqual(self._changes(), {self.template})
+
+    def test_ignores_unwatched_siblings(self):
+        self.write("notes.txt", "ignored")
+        self.assertEqual(wait_for_changes(self.watcher, timeout=self.debounce), set())
+
+
+class TestInotifyWatcher(WatcherTests, SiteTestCase):
+    debounce = 0.05
+
+    def create_watcher(self, directories, files):
+        try:
+            return InotifyWatcher(directories, files)
+        except (AttributeError, OSError):
+            self.skipTest("inotify is unavailable")
+
+    def test_edits_in_new_directory_are_watched(self):
+        self.write("content/blog/a/index.md", "# A")
+        self._changes()
+        self.write("content/blog/a/index.md", "# A, edited")
+        self.assertEqual(self._changes(), {os.path.join(self.content, "blog", "a", "index.md")})
+
+    def test_moved_away_directory_reports_root(self):
+        self.write("content/blog/index.md", "# Blog")
+        self._changes()
+        shutil.move(os.path.join(self.content, "blog"), os.path.join(self.root, "blog"))
+        self.assertEqual(self._changes(), {self.content})
+
+
+class TestPollingWatcher(WatcherTests, SiteTestCase):
+    debounce = 0.05
+
+    def create_watcher(self, directories, files):
+        return PollingWatcher(directories, files, interval=0.01)
+
+
+class TestWaitForChanges(unittest.TestCase):
+    def test_coalesces_until_quiet(self):
+        watcher = FakeWatcher([{"a"}, {"b"}, {"a", "c"}])
+        self.assertEqual(wait_for_changes(watcher, timeout=1), {"a", "b", "c"})
+
+    def test_timeout_without_changes(self):
+        self.assertEqual(wait_for_changes(FakeWatcher([]), timeout=0), set())
+
+
+class TestWatch(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/index.md", "# Blog")
+        self.write("static/index.css", "body {}")
+        self.builder = SiteBuilder(self.root)
+        run_quietly(self.builder.build)
+
+    def tearDown(self):
+        self.builder.close()
+        super().tearDown()
+
+    def test_markdown_edit_renders_only_that_page(self):
+        path = self.write("content/blog/index.md", "# Blog, edited")
+        watcher = FakeWatcher([{path}])
+        _, output = run_quietly(watch, self.builder, watcher)
+        self.assertIn("Changed: content/blog/index.md", output)
+        self.assertIn("1 pages rendered, 0 static files copied", output)
+        self.assertIn("Blog, edited", self.read_output("blog/index.html"))
+        self.assertTrue(watcher.closed)
+
+    def test_static_change_copies_only_that_file(self):
+        path = self.write("static/index.css", "body { color: red }")
+        _, output = run_quietly(watch, self.builder, FakeWatcher([{path}]))
+        self.assertIn("0 pages rendered, 1 static files copied", output)
+        self.assertEqual(self.read_output("index.css"), "body { color: red }")
+
+    def test_template_change_rewraps_all_pages(self):
+        path = self.write("template.html", "<main>{{ Content }}</main>")
+        _, output = run_quietly(watch, self.builder, FakeWatcher([{path}]))
+        self.assertIn("2 pages rendered", output)
+        self.assertEqual(self.read_output("index.html"), "<main><div><h1>Home</h1></div></main>")
+
+    def test_failed_build_keeps_watching(self):
+        path = self.write("content/index.md", "no header")
+        fixed = self.write("content/blog/index.md", "# Blog, edited")
+        _, output = run_quietly(watch, self.builder, FakeWatcher([{path}, None, {fixed}]))
+        self.assertIn("Build failed: Exception: No h1 header found", output)
+        # The next change is still picked up and built
+        retry = output.index("Changed: content/blog/index.md")
+        self.assertGreater(retry, output.index("Build failed"))
+        self.assertIn("1 pages rendered", output[retry:])
+
+    def test_deleted_non_markdown_content_is_ignored(self):
+        path = os.path.join(self.root, "content", "notes.txt")
+        _, output = run_quietly(self.builder.build_paths, [path])
+        self.assertNotIn("Starting static site generation", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
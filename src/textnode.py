@@ -1,4 +1,6 @@
+import io
 import re
+from collections import Counter
 from enum import Enum
 from htmlnode import LeafNode, ParentNode
 
@@ -21,6 +23,8 @@ class BlockType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -82,32 +86,81 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 
+# One alternation per inline construct. finditer walks the text once; at
+# each position the earliest construct wins and bold is tried before italic.
+INLINE_PATTERN = re.compile(
+    r"\*\*(?P<bold>.*?)\*\*"
+    r"|\*(?!\*)(?P<italic>.*?)\*"
+    r"|_(?P<underscore>.*?)_"
+    r"|`(?P<code>.*?)`"
+    r"|!\[(?P<image_alt>[^\[\]]*?)\]\((?P<image_url>[^\(\)]*?)\)"
+    r"|(?<!!)\[(?P<link_text>[^\[\]]*?)\]\((?P<link_url>[^\(\)]*?)\)",
+    re.DOTALL,
+)
+
+# Any delimiter left in plain text after scanning has no partner
+UNMATCHED_DELIMITER_PATTERN = re.compile(r"\*\*|[*_`]")
+
+
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = []
+    position = 0
+
+    for match in INLINE_PATTERN.finditer(text):
+        start = match.start()
+        if start > position:
+            nodes.append(_plain_text_node(text, position, start))
+
+        kind = match.lastgroup
+        if kind == "bold":
+            nodes.append(TextNode(match.group("bold"), TextType.BOLD))
+        elif kind == "italic" or kind == "underscore":
+            nodes.append(TextNode(match.group(kind), TextType.ITALIC))
+        elif kind == "code":
+            nodes.append(TextNode(match.group("code"), TextType.CODE))
+        elif kind == "image_url":
+            nodes.append(TextNode(match.group("image_alt"), TextType.IMAGE, match.group("image_url")))
+        else:
+            nodes.append(TextNode(match.group("link_text"), TextType.LINK, match.group("link_url")))
+
+        position = match.end()
 
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    if position < len(text) or not nodes:
+        nodes.append(_plain_text_node(text, position, len(text)))
 
     return nodes
 
 
+def _plain_text_node(text, start, end):
+    unmatched = UNMATCHED_DELIMITER_PATTERN.search(text, start, end)
+    if unmatched:
+        raise ValueError(f"Invalid markdown syntax: unmatched delimiter '{unmatched.group()}' in text '{text}'")
+    return TextNode(text[start:end], TextType.TEXT)
+
+
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*?)\]\(([^\(\)]*?)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*?)\]\(([^\(\)]*?)\)")
+
+
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*?)\]\(([^\(\)]*?)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*?)\]\(([^\(\)]*?)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
 
 
 def split_nodes_image(old_nodes):
+    return _split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
+
+
+def split_nodes_link(old_nodes):
+    return _split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    # Slice each text node around its match spans, so the text is scanned
+    # once and the remainder is never re-copied per match
     new_nodes = []
 
     for old_node in old_nodes:
@@ -116,133 +169,131 @@ def split_nodes_image(old_nodes):
             continue
 
         text = old_node.text
-        images = extract_markdown_images(text)
-
-        if not images:
-            new_nodes.append(old_node)
-            continue
+        position = 0
 
-        current_text = text
-        for alt_text, url in images:
-            full_image_markdown = f"![{alt_text}]({url})"
+        for match in pattern.finditer(text):
+            start = match.start()
+            if start > position:
+                new_nodes.append(TextNode(text[position:start], TextType.TEXT))
 
-            parts = current_text.split(full_image_markdown, 1)
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
 
-            if len(parts) != 2:
-                continue
-
-            before_text = parts[0]
-            after_text = parts[1]
-
-            if before_text:
-                new_nodes.append(TextNode(before_text, TextType.TEXT))
+        if position == 0:
+            # No matches: keep the original node
+            new_nodes.append(old_node)
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
 
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
+    return new_nodes
 
-            current_text = after_text
 
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
+# A line that opens or closes a fenced code block
+FENCE_PATTERN = re.compile(r"\s*```[^`]*$")
 
-    return new_nodes
 
+def _iter_lines(markdown):
+    # Accept either a markdown string or any iterable of lines (such as an
+    # open file) without copying the whole source
+    if isinstance(markdown, str):
+        return io.StringIO(markdown)
+    return markdown
 
-def split_nodes_link(old_nodes):
-    new_nodes = []
 
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
-            continue
+def iter_markdown_blocks(markdown):
+    # Yield stripped blocks one at a time. Blocks are separated by empty
+    # lines, except inside fenced code blocks.
+    block_lines = []
+    in_fence = False
 
-        text = old_node.text
-        links = extract_markdown_links(text)
+    for line in _iter_lines(markdown):
+        if line.endswith("\n"):
+            line = line[:-1]
 
-        if not links:
-            new_nodes.append(old_node)
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif line == "" and not in_fence:
+            block = "\n".join(block_lines).strip()
+            if block:
+                yield block
+            block_lines = []
             continue
 
-        current_text = text
-        for link_text, url in links:
-            full_link_markdown = f"[{link_text}]({url})"
+        block_lines.append(line)
 
-            parts = current_text.split(full_link_markdown, 1)
+    block = "\n".join(block_lines).strip()
+    if block:
+        yield block
 
-            if len(parts) != 2:
-                continue
 
-            before_text = parts[0]
-            after_text = parts[1]
+def markdown_to_blocks(markdown):
+    return list(iter_markdown_blocks(markdown))
 
-            if before_text:
-                new_nodes.append(TextNode(before_text, TextType.TEXT))
 
-            new_nodes.append(TextNode(link_text, TextType.LINK, url))
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+ORDERED_ITEM_PATTERN = re.compile(r"([1-9][0-9]*)\. ")
 
-            current_text = after_text
 
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
+def _classify_heading(block):
+    # 1-6 # characters followed by a space
+    if HEADING_PATTERN.match(block):
+        return BlockType.HEADING, None
+    return BlockType.PARAGRAPH, None
 
-    return new_nodes
 
+def _classify_code(block):
+    # Starts and ends with ``` and spans more than one line
+    if "\n" in block and block.startswith("```") and block.endswith("```"):
+        return BlockType.CODE, None
+    return BlockType.PARAGRAPH, None
 
-def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    filtered_blocks = []
 
-    for block in blocks:
-        stripped_block = block.strip()
-        if stripped_block:
-            filtered_blocks.append(stripped_block)
+def _classify_quote(block):
+    lines = block.split("\n")
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE, lines
+    return BlockType.PARAGRAPH, None
 
-    return filtered_blocks
 
+def _classify_unordered_list(block):
+    lines = block.split("\n")
+    if all(line.startswith("- ") for line in lines):
+        return BlockType.UNORDERED_LIST, lines
+    return BlockType.PARAGRAPH, None
 
-def block_to_block_type(block):
-    lines = block.split('\n')
-
-    # Check for heading (1-6 # characters followed by space)
-    if block.startswith('#'):
-        # Count leading # characters
-        hash_count = 0
-        for char in block:
-            if char == '#':
-                hash_count += 1
-            else:
-                break
 
-        # Must be 1-6 # characters followed by a space
-        if 1 <= hash_count <= 6 and len(block) > hash_count and block[hash_count] == ' ':
-            return BlockType.HEADING
+def _classify_ordered_list(block):
+    # Lines must be numbered 1. 2. 3. ... in order
+    lines = block.split("\n")
+    for expected_number, line in enumerate(lines, 1):
+        match = ORDERED_ITEM_PATTERN.match(line)
+        if match is None or int(match.group(1)) != expected_number:
+            return BlockType.PARAGRAPH, None
+    return BlockType.ORDERED_LIST, lines
 
-    # Check for code block (starts with ``` and ends with ```)
-    if len(lines) > 1 and block.startswith('```') and block.endswith('```'):
-        return BlockType.CODE
 
-    # Check for quote block (every line starts with >)
-    if all(line.startswith('>') for line in lines):
-        return BlockType.QUOTE
+# Only blocks starting with one of these characters can be anything other
+# than a paragraph, so most paragraphs are classified with one dict lookup
+BLOCK_CLASSIFIERS = {
+    "#": _classify_heading,
+    "`": _classify_code,
+    ">": _classify_quote,
+    "-": _classify_unordered_list,
+    "1": _classify_ordered_list,
+}
 
-    # Check for unordered list (every line starts with - followed by space)
-    if all(line.startswith('- ') for line in lines):
-        return BlockType.UNORDERED_LIST
 
-    # Check for ordered list (lines start with number. followed by space, incrementing from 1)
-    if len(lines) > 0:
-        is_ordered_list = True
-        for i, line in enumerate(lines):
-            expected_number = i + 1
-            expected_start = f"{expected_number}. "
-            if not line.startswith(expected_start):
-                is_ordered_list = False
-                break
+def classify_block(block):
+    # Returns (block_type, lines). lines is the block already split on
+    # newlines when classification needed it, otherwise None.
+    classifier = BLOCK_CLASSIFIERS.get(block[:1])
+    if classifier is None:
+        return BlockType.PARAGRAPH, None
+    return classifier(block)
 
-        if is_ordered_list:
-            return BlockType.ORDERED_LIST
 
-    # Default to paragraph
-    return BlockType.PARAGRAPH
+def block_to_block_type(block):
+    return classify_block(block)[0]
 
 
 def text_to_children(text):
@@ -255,8 +306,7 @@ def text_to_children(text):
 
 
 def paragraph_to_html_node(block):
-    lines = block.split("\n")
-    paragraph_text = " ".join(lines)
+    paragraph_text = block.replace("\n", " ")
     children = text_to_children(paragraph_text)
     return ParentNode("p", children)
 
@@ -286,8 +336,10 @@ def code_to_html_node(block):
     return ParentNode("pre", [code_node])
 
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
+def quote_to_html_node(block, lines=None):
+    if lines is None:
+        lines = block.split("\n")
+
     new_lines = []
     for line in lines:
         if not line.startswith(">"):
@@ -299,8 +351,8 @@ def quote_to_html_node(block):
     return ParentNode("blockquote", children)
 
 
-def unordered_list_to_html_node(block):
-    items = block.split("\n")
+def unordered_list_to_html_node(block, lines=None):
+    items = lines if lines is not None else block.split("\n")
     html_items = []
     for item in items:
         text = item[2:]  # Remove "- "
@@ -309,8 +361,8 @@ def unordered_list_to_html_node(block):
     return ParentNode("ul", html_items)
 
 
-def ordered_list_to_html_node(block):
-    items = block.split("\n")
+def ordered_list_to_html_node(block, lines=None):
+    items = lines if lines is not None else block.split("\n")
     html_items = []
     for item in items:
         # Find the first space after the number and period
@@ -321,35 +373,166 @@ def ordered_list_to_html_node(block):
     return ParentNode("ol", html_items)
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-
-    for block in blocks:
-        block_type = block_to_block_type(block)
-
-        if block_type == BlockType.PARAGRAPH:
-            children.append(paragraph_to_html_node(block))
-        elif block_type == BlockType.HEADING:
-            children.append(heading_to_html_node(block))
+# Longest summary kept for a page, in characters
+SUMMARY_LENGTH = 200
+
+# Search terms: runs of two or more word characters, lowercased
+TERM_PATTERN = re.compile(r"\w\w+")
+
+
+class DocumentMetadata:
+    # Facts about a document collected while its blocks are converted, so
+    # callers never need a second pass over the source
+    def __init__(self, collect_terms=False):
+        self.title = None
+        self.headings = []
+        self.word_count = 0
+        self.summary = None
+        self.front_matter = {}
+        # Link hrefs and image srcs, in document order
+        self.links = []
+        self.images = []
+        # Search term counts from the rendered text, markup excluded; None
+        # unless collect_terms is set
+        self.terms = Counter() if collect_terms else None
+
+    def add_block(self, block_type, block, lines=None):
+        if block_type == BlockType.HEADING:
+            level = len(block) - len(block.lstrip("#"))
+            text = block[level + 1:].strip()
+            self.headings.append((level, text))
+            if level == 1 and self.title is None:
+                # Only the heading's own line, as extract_title reads it
+                self.title = text.split("\n", 1)[0].strip()
         elif block_type == BlockType.CODE:
-            children.append(code_to_html_node(block))
+            text = block[4:-3]
         elif block_type == BlockType.QUOTE:
-            children.append(quote_to_html_node(block))
+            text = " ".join(line[1:] for line in lines)
         elif block_type == BlockType.UNORDERED_LIST:
-            children.append(unordered_list_to_html_node(block))
+            text = " ".join(line[2:] for line in lines)
         elif block_type == BlockType.ORDERED_LIST:
-            children.append(ordered_list_to_html_node(block))
+            text = " ".join(line[line.find(". ") + 2:] for line in lines)
         else:
-            raise ValueError(f"Invalid block type: {block_type}")
+            text = block
+
+        self.word_count += len(text.split())
+
+    def add_paragraph(self, parts):
+        # parts are (text, is_link) for a paragraph's inline nodes, images
+        # excluded. The summary is the plain text of the first paragraph
+        # that is not only links, such as a "Back Home" link.
+        if self.summary is not None:
+            return
+        parts = list(parts)
+        if any(text.strip() and not is_link for text, is_link in parts):
+            self.set_summary("".join(text for text, _ in parts))
+
+    def set_summary(self, text):
+        # Cut long summaries at a word boundary
+        if len(text) > SUMMARY_LENGTH:
+            text = text[:SUMMARY_LENGTH].rsplit(" ", 1)[0] + "…"
+        self.summary = text
+
+    def add_text(self, text):
+        self.terms.update(TERM_PATTERN.findall(text.lower()))
+
+    def add_urls(self, node):
+        # Collect the hrefs and srcs of a converted block's nodes
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.props:
+                if node.tag == "a" and "href" in node.props:
+                    self.links.append(node.props["href"])
+                elif node.tag == "img" and "src" in node.props:
+                    self.images.append(node.props["src"])
+            if node.children:
+                stack.extend(reversed(node.children))
 
-    return ParentNode("div", children)
+    def __eq__(self, other):
+        return (
+            self.title == other.title
+            and self.headings == other.headings
+            and self.word_count == other.word_count
+            and self.summary == other.summary
+            and self.front_matter == other.front_matter
+            and self.links == other.links
+            and self.images == other.images
+            and self.terms == other.terms
+        )
+
+    def __repr__(self):
+        return f"DocumentMetadata({self.title}, {self.headings}, {self.word_count})"
+
+
+def block_to_html_node(block, metadata=None):
+    block_type, lines = classify_block(block)
+
+    if block_type == BlockType.PARAGRAPH:
+        node = paragraph_to_html_node(block)
+    elif block_type == BlockType.HEADING:
+        node = heading_to_html_node(block)
+    elif block_type == BlockType.CODE:
+        node = code_to_html_node(block)
+    elif block_type == BlockType.QUOTE:
+        node = quote_to_html_node(block, lines)
+    elif block_type == BlockType.UNORDERED_LIST:
+        node = unordered_list_to_html_node(block, lines)
+    elif block_type == BlockType.ORDERED_LIST:
+        node = ordered_list_to_html_node(block, lines)
+    else:
+        raise ValueError(f"Invalid block type: {block_type}")
+
+    if metadata is not None:
+        metadata.add_block(block_type, block, lines)
+        if metadata.summary is None and block_type == BlockType.PARAGRAPH:
+            metadata.add_paragraph((child.value, child.tag == "a") for child in node.children if child.tag != "img")
+        # Every link and image needs "](", so most blocks are not walked
+        if "](" in block:
+            metadata.add_urls(node)
+        if metadata.terms is not None:
+            metadata.add_text(node_text(node))
+    return node
+
+
+def node_text(node):
+    # Text of a node's leaves, without markup, separated by spaces
+    parts = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children:
+            stack.extend(reversed(node.children))
+        elif node.value:
+            parts.append(node.value)
+    return " ".join(parts)
+
+
+def markdown_to_html_node(markdown, with_metadata=False):
+    # With with_metadata=True, returns (node, DocumentMetadata) gathered in
+    # the same pass over the blocks
+    metadata = DocumentMetadata() if with_metadata else None
+    children = [block_to_html_node(block, metadata) for block in iter_markdown_blocks(markdown)]
+    node = ParentNode("div", children)
+
+    if with_metadata:
+        return node, metadata
+    return node
+
+
+def write_markdown_html(markdown, sink, basepath="/", metadata=None):
+    # Streaming equivalent of markdown_to_html_node(markdown).write_html():
+    # each block is converted and written before the next one is read, so
+    # memory stays bounded by the largest block rather than the document.
+    # Pass a DocumentMetadata to have it filled in along the way.
+    sink.write("<div>")
+    for block in iter_markdown_blocks(markdown):
+        block_to_html_node(block, metadata).write_html(sink, basepath)
+    sink.write("</div>")
 
 
 def extract_title(markdown):
-    lines = markdown.strip().split('\n')
-
-    for line in lines:
+    for line in _iter_lines(markdown):
         stripped_line = line.strip()
         if stripped_line.startswith('# ') or stripped_line == '#':
             if not stripped_line.startswith('## '):
@@ -0,0 +1,237 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from discovery import scan_tree
+from linkcheck import format_report
+
+# inotify event bits, from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")
+
+# Seconds a burst of events must stay quiet before it is rebuilt
+DEBOUNCE_DELAY = 0.05
+
+# Seconds between scans when inotify is unavailable
+POLL_INTERVAL = 0.5
+
+
+class InotifyWatcher:
+    # Watches directory trees recursively, and single files through their
+    # parent directory so editors that save by renaming a temporary file
+    # over the original are still seen. poll() reports changed file paths;
+    # a watched root itself stands for "rescan everything", used when
+    # events were lost or a whole directory was moved.
+    def __init__(self, directories, files=()):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        # Raises AttributeError where libc has no inotify
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self.watches = {}
+        self.roots = []
+        self.files = {}
+        for dir_path in directories:
+            dir_path = os.path.abspath(dir_path)
+            self.roots.append(dir_path)
+            if os.path.isdir(dir_path):
+                self._watch_tree(dir_path)
+        for file_path in files:
+            file_path = os.path.abspath(file_path)
+            parent = os.path.dirname(file_path)
+            self.files.setdefault(parent, set()).add(os.path.basename(file_path))
+            if parent not in self.watches.values():
+                self._watch(parent)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def poll(self, timeout=None):
+        # Changed paths from the events that arrive within timeout seconds
+        # (None blocks until there is one)
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        return self._read_events(os.read(self.fd, 64 * 1024))
+
+    def _watch(self, dir_path):
+        wd = self._add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = dir_path
+        return wd >= 0
+
+    def _watch_tree(self, dir_path):
+        # Watch dir_path and every directory below it. Returns the files
+        # already there, which a new directory's watch would not report.
+        if not self._watch(dir_path):
+            return []
+        try:
+            tree = scan_tree(dir_path)
+        except FileNotFoundError:
+            # Gone again before we got to it
+            return []
+        for rel_dir in tree.directories:
+            self._watch(os.path.join(dir_path, rel_dir))
+        return [source.path for source in tree.files]
+
+    def _read_events(self, data):
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + name_length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + name_length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.update(self.roots)
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            dir_path = self.watches.get(wd)
+            if dir_path is None or not name:
+                continue
+            path = os.path.join(dir_path, os.fsdecode(name))
+
+            if dir_path in self.files and not self._in_root(path):
+                # A directory watched only for some of its files
+                if os.path.basename(path) in self.files[dir_path]:
+                    changed.add(path)
+            elif mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self._watch_tree(path))
+                elif mask & IN_MOVED_FROM:
+                    # Its files left without events of their own
+                    changed.add(self._root_of(path))
+                # Deleting a directory deletes its files first, and each
+                # of those has already been reported
+            else:
+                changed.add(path)
+        return changed
+
+    def _in_root(self, path):
+        return any(path.startswith(root + os.sep) for root in self.roots)
+
+    def _root_of(self, path):
+        for root in self.roots:
+            if path.startswith(root + os.sep):
+                return root
+        return path
+
+
+class PollingWatcher:
+    # Fallback for platforms without inotify: rescans the watched trees
+    # and files every interval seconds and reports what changed
+    def __init__(self, directories, files=(), interval=POLL_INTERVAL):
+        self.directories = [os.path.abspath(dir_path) for dir_path in directories]
+        self.files = [os.path.abspath(file_path) for file_path in files]
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def close(self):
+        pass
+
+    def poll(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path for path in snapshot.keys() | self.snapshot.keys()
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+            if changed:
+                return changed
+
+            if deadline is None:
+                time.sleep(self.interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def _scan(self):
+        snapshot = {}
+        for dir_path in self.directories:
+            for source in scan_tree(dir_path).files:
+                snapshot[source.path] = (source.stat.st_mtime_ns, source.stat.st_size)
+        for file_path in self.files:
+            try:
+                file_stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            snapshot[file_path] = (file_stat.st_mtime_ns, file_stat.st_size)
+        return snapshot
+
+
+def create_watcher(directories, files=()):
+    try:
+        return InotifyWatcher(directories, files)
+    except (AttributeError, OSError):
+        print("inotify is unavailable; polling for changes")
+        return PollingWatcher(directories, files)
+
+
+def wait_for_changes(watcher, debounce=DEBOUNCE_DELAY, timeout=None):
+    # Block until something changes, then keep collecting until the
+    # watched trees have been quiet for debounce seconds, so that a save
+    # made of several writes or renames, or a batch of files copied at
+    # once, becomes one rebuild
+    changed = watcher.poll(timeout)
+    while changed:
+        more = watcher.poll(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed
+
+
+def watch(builder, watcher=None, debounce=DEBOUNCE_DELAY):
+    # Rebuild what each burst of changes affects until interrupted
+    if watcher is None:
+        watcher = create_watcher([builder.content_path, builder.static_path], [builder.template_path])
+    print("Watching content/, static/ and template.html for changes (Ctrl-C to stop)")
+    try:
+        while True:
+            changed = wait_for_changes(watcher, debounce)
+            if not changed:
+                continue
+            for path in sorted(changed):
+                print(f"Changed: {os.path.relpath(path, builder.project_root)}")
+            try:
+                result = builder.build_paths(sorted(changed))
+            except Exception as e:
+                # Keep watching; the next save may well fix it
+                print(f"Build failed: {type(e).__name__}: {e}")
+                continue
+            for line in format_report(result.broken):
+                print(line)
+            print(result.summary())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()